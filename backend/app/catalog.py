@@ -0,0 +1,262 @@
+"""
+Animal Catalog Module
+
+This module keeps an in-process copy of the `animals` table for label lookups
+and reads catalog files for bulk imports.
+
+Features:
+- Immutable catalog snapshot, replaced in a single assignment after a reload
+- Trigram index for substring label matching, built in a worker thread
+- Background refresh after CATALOG_CACHE_TTL seconds (requests keep using the old snapshot)
+- CSV / JSONL record readers for Database.import_animals
+- Small LRU cache for animal search results, cleared whenever the catalog changes
+"""
+
+import asyncio
+import csv
+import io
+import json
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple
+from sqlalchemy import text
+from .config import settings
+from .logger import logger
+
+# Columns accepted in import files, in COPY order
+ANIMAL_COLUMNS = ("name", "species", "habitat", "diet", "description")
+
+
+# Substring lookups go through an index of 3-character grams
+GRAM_SIZE = 3
+# Rows fetched per round trip when the catalog is reloaded
+RELOAD_CHUNK_SIZE = 5000
+
+
+def _grams(value: str) -> set:
+    return {value[i:i + GRAM_SIZE] for i in range(len(value) - GRAM_SIZE + 1)}
+
+
+def _index(values) -> Dict[str, array]:
+    """gram -> ascending positions of the values containing it"""
+    index = {}
+    for position, value in enumerate(values):
+        for gram in _grams(value):
+            postings = index.get(gram)
+            if postings is None:
+                postings = index[gram] = array('I')
+            postings.append(position)
+    return index
+
+
+class CatalogSnapshot:
+    """
+    Read-only view of the animals table used for label matching.
+    Building one takes a while for large catalogs, so AnimalCatalog builds it
+    in a worker thread. Lookups only touch the posting list of the rarest gram
+    of the label, then confirm the candidates with a substring test.
+    """
+
+    __slots__ = ("ids", "names", "species", "by_name", "name_index", "species_index", "loaded_at")
+
+    def __init__(self, rows):
+        # rows: (id, name, species) ordered by id, positions below follow that order
+        self.ids = array('q')
+        names, species = [], []
+        for animal_id, name, animal_species in rows:
+            self.ids.append(animal_id)
+            names.append(name.lower())
+            species.append((animal_species or "").lower())
+        self.names = tuple(names)
+        self.species = tuple(species)
+        # exact name lookups skip the index
+        self.by_name = {}
+        for position, name in enumerate(self.names):
+            self.by_name.setdefault(name, position)
+        self.name_index = _index(self.names)
+        self.species_index = _index(self.species)
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def can_match(label: str) -> bool:
+        """Labels shorter than a gram cannot use the index, callers ask the database instead"""
+        return len(label) >= GRAM_SIZE
+
+    @staticmethod
+    def _candidates(index: Dict[str, array], needle: str) -> array:
+        """Positions that may contain needle: the shortest posting list among its grams"""
+        shortest = None
+        for gram in _grams(needle):
+            postings = index.get(gram)
+            if postings is None:
+                return array('I')
+            if shortest is None or len(postings) < len(shortest):
+                shortest = postings
+        return shortest
+
+    def is_animal(self, label: str) -> bool:
+        """Same rule as `name ILIKE %label% OR species ILIKE %label%`, for labels accepted by can_match"""
+        needle = label.lower()
+        if needle in self.by_name:
+            return True
+        names, species = self.names, self.species
+        return (
+            any(needle in names[position] for position in self._candidates(self.name_index, needle))
+            or any(needle in species[position] for position in self._candidates(self.species_index, needle))
+        )
+
+    def find_animal_id(self, label: str) -> Optional[int]:
+        """Same rule as `name ILIKE %label% ORDER BY id LIMIT 1`, for labels accepted by can_match"""
+        needle = label.lower()
+        names = self.names
+        # postings are ascending, so the first hit has the lowest id
+        for position in self._candidates(self.name_index, needle):
+            if needle in names[position]:
+                return self.ids[position]
+        return None
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with a time limit per entry.
+    Only used from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        stored_at, value = item
+        if time.monotonic() - stored_at > self.ttl:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+class AnimalCatalog:
+    """
+    Cache of the animal catalog.
+    A reload builds a complete new snapshot before swapping the reference,
+    so readers always see either the old or the new catalog, never a mix.
+    """
+
+    def __init__(self, engine, ttl: int = settings.CATALOG_CACHE_TTL):
+        self.engine = engine
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+        # search results depend on the catalog, so they are dropped on every reload
+        self.search_cache = LRUCache(settings.SEARCH_CACHE_SIZE, ttl)
+
+    async def get(self) -> CatalogSnapshot:
+        """Return the current snapshot, loading it on first use"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            # concurrent first callers share one load, see reload(force=False)
+            return await self.reload(force=False)
+        if time.monotonic() - snapshot.loaded_at > self.ttl and self._refresh_task is None:
+            # stale: refresh in the background and keep serving the current snapshot
+            self._refresh_task = asyncio.create_task(self._background_reload())
+        return snapshot
+
+    async def reload(self, force: bool = True) -> CatalogSnapshot:
+        """
+        Load the animals table and swap in the new snapshot.
+        With force=False an already loaded snapshot is returned as is, so requests
+        that queued on the lock during a cold start do not load the table again.
+        """
+        async with self._lock:
+            if not force and self._snapshot is not None:
+                return self._snapshot
+            rows = []
+            async with self.engine.connect() as conn:
+                # server-side cursor, the event loop gets control back between chunks
+                query = text("SELECT id, name, species FROM animals ORDER BY id")
+                result = await conn.stream(query.execution_options(yield_per=RELOAD_CHUNK_SIZE))
+                async for chunk in result.partitions(RELOAD_CHUNK_SIZE):
+                    rows.extend(tuple(row) for row in chunk)
+            # building the index is CPU bound, keep it off the event loop
+            snapshot = await asyncio.to_thread(CatalogSnapshot, rows)
+            self._snapshot = snapshot
+            self.search_cache.clear()
+            logger.info(f"Animal catalog loaded: {len(snapshot)} animals")
+            return snapshot
+
+    async def _background_reload(self):
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Animal catalog refresh failed: {e}")
+        finally:
+            self._refresh_task = None
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _to_record(data: Dict, line_number: int) -> Tuple:
+    record = tuple(_clean(data.get(column)) for column in ANIMAL_COLUMNS)
+    if not record[0]:
+        raise ValueError(f"Line {line_number}: 'name' is required")
+    if len(record[0]) > 100 or (record[1] and len(record[1]) > 100):
+        raise ValueError(f"Line {line_number}: 'name' and 'species' must be at most 100 characters")
+    return record
+
+
+def read_animal_records(stream: io.TextIOBase, file_format: str) -> Iterator[Tuple]:
+    """
+    Yield (name, species, habitat, diet, description) tuples from a text stream.
+
+    Args:
+        stream: CSV with a header row, or JSON Lines (one object per line)
+        file_format: "csv" or "jsonl"
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for line_number, data in enumerate(reader, start=2):
+            yield _to_record(data, line_number)
+    elif file_format == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line_number}: invalid JSON ({e})")
+            yield _to_record(data, line_number)
+    else:
+        raise ValueError(f"Unsupported catalog format: {file_format}")
+
+
+def detect_format(filename: str) -> str:
+    """Guess the import format from a file name"""
+    lowered = (filename or "").lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError("Catalog file must be .csv or .jsonl")
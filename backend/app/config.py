@@ -34,7 +34,21 @@ class Settings(BaseSettings):
     AWS_ACCESS_KEY_ID: str          # AWS access key for service authentication
     AWS_SECRET_ACCESS_KEY: str      # AWS secret key for service authentication
     AWS_REGION: str = "ap-northeast-2"  # Default AWS region
-    S3_BUCKET: str                  # S3 bucket name for image storage
+    S3_BUCKET: str = ""             # S3 bucket name for image storage (STORAGE_BACKEND=s3)
+    S3_ENDPOINT_URL: str = ""       # S3-compatible endpoint (e.g. MinIO for benchmarks), empty uses AWS
+    
+    # Image Storage Configuration
+    STORAGE_BACKEND: str = "s3"     # "s3" or "local"
+    LOCAL_STORAGE_ROOT: str = "/data/images"  # Image directory for STORAGE_BACKEND=local
+    LOCAL_STORAGE_URL: str = ""     # Public URL prefix for local images (default: BACKEND_URL/api/images)
+    
+    # Partition Archive Configuration (never publicly readable, kept apart from the images)
+    ARCHIVE_S3_BUCKET: str = ""     # Private bucket for partition archives (STORAGE_BACKEND=s3), required by retention
+    LOCAL_ARCHIVE_ROOT: str = "/data/archive"  # Archive directory for STORAGE_BACKEND=local, outside LOCAL_STORAGE_ROOT
+    
+    # Partition Maintenance
+    PARTITION_ENSURE_INTERVAL: int = 21600  # Seconds between partition checks in the API, 0 disables them
+    PARTITION_MONTHS_AHEAD: int = 3 # Monthly partitions created ahead of the current month
     
     # Database Configuration
     DB_USER: str                    # Database username
@@ -48,6 +62,19 @@ class Settings(BaseSettings):
     FRONTEND_URL: str               # Frontend URL for CORS (e.g., Elastic IP or domain)
     BACKEND_URL: str               # Backend URL for API endpoints
     
+    # Admin Configuration
+    ADMIN_TOKEN: str = ""           # Token for admin endpoints (X-Admin-Token header), empty disables them
+    
+    # Animal catalog cache
+    CATALOG_CACHE_TTL: int = 300    # Seconds before the in-process animal catalog is refreshed in the background
+    SEARCH_CACHE_SIZE: int = 256    # Number of animal search results kept in memory
+    SEARCH_MAX_CANDIDATES: int = 1000  # Nearest names / species ranked by the fuzzy search fallback
+    
+    # Request profiling (requests with header "X-Profile: <ADMIN_TOKEN>")
+    PROFILING_ENABLED: bool = False # Install the profiling middleware
+    PROFILE_DIR: str = "/tmp/animallens-profiles"  # Directory of the profile ring buffer
+    PROFILE_MAX_FILES: int = 50     # Number of profiles kept on disk
+    
     class Config:
         env_file = ENV_FILE
         env_file_encoding = 'utf-8'
@@ -67,6 +94,10 @@ class Settings(BaseSettings):
         if not self.DATABASE_URL:
             self.DATABASE_URL = f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
             logger.debug(f"Generated DATABASE_URL: {self.DATABASE_URL.replace(self.DB_PASSWORD, '****')}")
+        
+        # local images are served by this API unless another URL is configured
+        if not self.LOCAL_STORAGE_URL:
+            self.LOCAL_STORAGE_URL = f"{self.BACKEND_URL.rstrip('/')}/api/images"
 
     @property
     def is_development(self):
@@ -6,14 +6,20 @@ This module handles all database operations for the Animal Lens application.
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select, text
+from sqlalchemy import select, text, bindparam
 from fastapi import HTTPException  # ✅ FastAPI exception handling added
 from .config import settings
 from .models import Animal, AnalysisResult
-from typing import List, Dict
+from typing import List, Dict, Optional
 from contextlib import asynccontextmanager
 from .logger import logger
+from .catalog import AnimalCatalog, ANIMAL_COLUMNS
+from .partition_map import PartitionIdMap, UNBOUNDED
+from .schemas import AnalysisResultView, AnimalView
 import ssl
+import json
+import base64
+from datetime import datetime
 
 # create SSL context
 ssl_context = ssl.create_default_context()
@@ -34,10 +40,129 @@ AsyncSessionLocal = sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False
 )
+
+# In-process copy of the animals table used for label lookups
+animal_catalog = AnimalCatalog(engine)
+
+# id -> created_at bounds, so lookups by id only scan the matching monthly partitions
+analysis_results_ids = PartitionIdMap(engine, "analysis_results")
+unidentified_animals_ids = PartitionIdMap(engine, "unidentified_animals")
+
+# Merge the staged catalog into animals (last row wins for duplicate names)
+MERGE_STAGED_ANIMALS = """
+    INSERT INTO animals (name, species, habitat, diet, description)
+    SELECT DISTINCT ON (name) name, species, habitat, diet, description
+    FROM animals_staging
+    ORDER BY name, seq DESC
+    ON CONFLICT (name) DO UPDATE
+    SET species = EXCLUDED.species,
+        habitat = EXCLUDED.habitat,
+        diet = EXCLUDED.diet,
+        description = EXCLUDED.description
+"""
+# Column-only projection for GET /api/results/{id} (no ORM objects are built)
+ANALYSIS_RESULT_VIEW = (
+    select(
+        AnalysisResult.id,
+        AnalysisResult.image_url,
+        AnalysisResult.label,
+        AnalysisResult.confidence,
+        AnalysisResult.created_at,
+        Animal.id.label("animal_id"),
+        Animal.name,
+        Animal.species,
+        Animal.habitat,
+        Animal.diet,
+        Animal.description
+    )
+    .outerjoin(Animal, AnalysisResult.matched_animal_id == Animal.id)
+    .where(
+        AnalysisResult.id == bindparam("result_id"),
+        AnalysisResult.created_at >= bindparam("since"),
+        AnalysisResult.created_at < bindparam("until")
+    )
+    .limit(1)
+)
+
+# Read one unidentified animal, bounded by created_at like ANALYSIS_RESULT_VIEW
+UNIDENTIFIED_ANIMAL_BY_ID = text("""
+    SELECT 
+        id,
+        label,
+        confidence,
+        image_url
+    FROM unidentified_animals
+    WHERE id = :id
+      AND created_at >= :since AND created_at < :until
+""")
+
+# Both searches page with a (rank, id) keyset: the first page passes after_rank = Infinity.
+# The candidate set must not change between pages, so it is never cut arbitrarily.
+
+# Full-text search over name, species, habitat and description (every match is ranked)
+SEARCH_ANIMALS_FULLTEXT = text("""
+    WITH candidates AS (
+        SELECT id, name, species, habitat, diet, description,
+               ts_rank_cd(search_vector, query) AS rank
+        FROM animals, websearch_to_tsquery('english', :q) AS query
+        WHERE search_vector @@ query
+    )
+    SELECT * FROM candidates
+    WHERE rank < :after_rank OR (rank = :after_rank AND id > :after_id)
+    ORDER BY rank DESC, id
+    LIMIT :limit
+""")
+
+# Typo-tolerant fallback using the GiST trigram indexes on name and species.
+# Candidates are the :max_candidates nearest names and species (index-ordered by
+# distance, ties by id), which always contain the best ranked matches.
+SEARCH_ANIMALS_FUZZY = text("""
+    WITH candidates AS (
+        SELECT id, name, species, habitat, diet, description,
+               GREATEST(similarity(name, :q), similarity(coalesce(species, ''), :q)) AS rank
+        FROM animals
+        WHERE id IN (
+            (SELECT id FROM animals ORDER BY name <-> :q, id LIMIT :max_candidates)
+            UNION
+            (SELECT id FROM animals WHERE species IS NOT NULL ORDER BY species <-> :q, id LIMIT :max_candidates)
+        )
+          AND (name % :q OR species % :q)
+    )
+    SELECT * FROM candidates
+    WHERE rank < :after_rank OR (rank = :after_rank AND id > :after_id)
+    ORDER BY rank DESC, id
+    LIMIT :limit
+""")
+
+SEARCH_QUERIES = {"fulltext": SEARCH_ANIMALS_FULLTEXT, "fuzzy": SEARCH_ANIMALS_FUZZY}
+
+
+def encode_search_cursor(match: str, rank: float, animal_id: int) -> str:
+    """Opaque cursor for the page after (rank, animal_id), repr() keeps the exact rank"""
+    return base64.urlsafe_b64encode(f"{match}|{rank!r}|{animal_id}".encode()).decode()
+
+
+def decode_search_cursor(cursor: str):
+    """
+    Returns:
+        tuple: (match, rank, animal_id)
+
+    Raises:
+        ValueError: if the cursor was not produced by encode_search_cursor
+    """
+    try:
+        match, rank, animal_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if match not in SEARCH_QUERIES:
+            raise ValueError(match)
+        return match, float(rank), int(animal_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
+
 # Database class
 class Database:
     def __init__(self):
         self.session_maker = AsyncSessionLocal
+        self.catalog = animal_catalog
 
     # Transaction context manager   
     @asynccontextmanager
@@ -47,35 +172,50 @@ class Database:
             async with session.begin():
                 yield session
 
+    async def _first_by_id(self, session, statement, params: Dict, id_map: PartitionIdMap, row_id: int):
+        """
+        Run a lookup by id within the created_at bounds of the id's partition,
+        and over all partitions only if the row is not there.
+        """
+        bounds = await id_map.bounds(row_id)
+        result = await session.execute(statement, {**params, "since": bounds[0], "until": bounds[1]})
+        row = result.first()
+        if row is None and bounds != UNBOUNDED:
+            result = await session.execute(statement, {**params, "since": UNBOUNDED[0], "until": UNBOUNDED[1]})
+            row = result.first()
+        return row
+
     # Check if the given label matches a known animal.
     async def is_animal(self, label: str) -> bool:
         """
         Check if the given label matches a known animal.
         """
-        async with self.session_maker() as session:
-            query = select(Animal).filter(
-                Animal.name.ilike(f"%{label}%") | Animal.species.ilike(f"%{label}%")
-            )
-            result = await session.execute(query)
-            is_match = bool(result.scalar_one_or_none())
-            logger.debug(f"Checking if '{label}' is known animal. Query result: {is_match}")
-            return is_match
+        catalog = await self.catalog.get()
+        if catalog.can_match(label):
+            is_match = catalog.is_animal(label)
+        else:
+            async with self.session_maker() as session:
+                query = select(Animal.id).filter(
+                    Animal.name.ilike(f"%{label}%") | Animal.species.ilike(f"%{label}%")
+                ).limit(1)
+                is_match = (await session.execute(query)).first() is not None
+        logger.debug(f"Checking if '{label}' is known animal. Catalog result: {is_match}")
+        return is_match
 
     # Save analysis result to database.
-    async def save_analysis_result(self, image_url: str, label: str, confidence: float) -> AnalysisResult:
+    async def save_analysis_result(self, image_url: str, label: str, confidence: float, labels: Optional[List[Dict]] = None) -> AnalysisResult:
         """
         Save analysis result to database.
         """
-        async with self.session_maker() as session:
-            query = select(Animal).filter(Animal.name.ilike(f"%{label}%"))
-            result = await session.execute(query)
-            animal = result.scalar_one_or_none()
+        animal_id = await self.find_animal_id(label)
 
+        async with self.session_maker() as session:
             analysis_result = AnalysisResult(
                 image_url=image_url,
                 label=label,
                 confidence=confidence,
-                matched_animal_id=animal.id if animal else None
+                matched_animal_id=animal_id,
+                labels=labels
             )
             session.add(analysis_result)
             await session.commit()
@@ -83,7 +223,7 @@ class Database:
             return analysis_result
 
     # Save unidentified animal data.
-    async def save_unidentified_animal(self, image_url: str, label: str, confidence: float) -> Dict:
+    async def save_unidentified_animal(self, image_url: str, label: str, confidence: float, labels: Optional[List[Dict]] = None) -> Dict:
         """
         Save unidentified animal data.
         """
@@ -128,12 +268,14 @@ class Database:
                         image_url,
                         label,
                         confidence,
+                        labels,
                         created_at
                     )
                     VALUES (
                         :image_url,
                         :label,
                         :confidence,
+                        CAST(:labels AS JSONB),
                         now()
                     )
                     RETURNING id
@@ -141,7 +283,8 @@ class Database:
                 result_analysis = await session.execute(query_analysis, {
                     "image_url": image_url,
                     "label": label,
-                    "confidence": confidence
+                    "confidence": confidence,
+                    "labels": json.dumps(labels) if labels is not None else None
                 })
                 await session.commit()
                 analysis_id = result_analysis.scalar()
@@ -171,17 +314,9 @@ class Database:
             try:
                 numeric_id = int(result_id)
                 logger.info(f"Fetching animal with ID: {numeric_id}")
-                query = text("""
-                    SELECT 
-                        id,
-                        label,
-                        confidence,
-                        image_url
-                    FROM unidentified_animals
-                    WHERE id = :id
-                """)
-                result = await session.execute(query, {"id": numeric_id})
-                row = result.first()
+                row = await self._first_by_id(
+                    session, UNIDENTIFIED_ANIMAL_BY_ID, {"id": numeric_id}, unidentified_animals_ids, numeric_id
+                )
 
                 
                 if row is None:
@@ -199,5 +334,213 @@ class Database:
                 }
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    # Retrieve an analysis result with its matched animal.
+    async def get_analysis_result(self, result_id: int) -> Optional[AnalysisResultView]:
+        """
+        Retrieve an analysis result and its matched animal as slotted view objects.
+        """
+        async with self.session_maker() as session:
+            row = await self._first_by_id(
+                session, ANALYSIS_RESULT_VIEW, {"result_id": result_id}, analysis_results_ids, result_id
+            )
+
+        if row is None:
+            return None
+        matched_animal = None
+        if row.animal_id is not None:
+            matched_animal = AnimalView(
+                row.animal_id, row.name, row.species, row.habitat, row.diet, row.description
+            )
+        return AnalysisResultView(
+            row.id, row.image_url, row.label, row.confidence, row.created_at, matched_animal
+        )
+
+    # Find the catalog animal matching a label.
+    async def find_animal_id(self, label: str) -> Optional[int]:
+        """
+        Return the id of the first animal whose name matches the label, or None.
+        """
+        catalog = await self.catalog.get()
+        if catalog.can_match(label):
+            return catalog.find_animal_id(label)
+        async with self.session_maker() as session:
+            query = select(Animal.id).filter(Animal.name.ilike(f"%{label}%")).order_by(Animal.id).limit(1)
+            return (await session.execute(query)).scalar_one_or_none()
+
+    # Overwrite the analysis of an existing result (used by reprocessing jobs).
+    async def update_analysis_result(self, analysis_id: int, created_at: datetime, label: Optional[str],
+                                     confidence: Optional[float], labels: List[Dict],
+                                     matched_animal_id: Optional[int]) -> None:
+        """
+        Store a fresh Rekognition analysis on an existing analysis_results row.
+        created_at is part of the primary key, it limits the update to one partition.
+        If label is None the previous selection is kept and only labels are replaced.
+        """
+        async with self.transaction() as session:
+            if label is None:
+                await session.execute(text("""
+                    UPDATE analysis_results
+                    SET labels = CAST(:labels AS JSONB)
+                    WHERE id = :id AND created_at = :created_at
+                """), {"id": analysis_id, "created_at": created_at, "labels": json.dumps(labels)})
+                return
+
+            await session.execute(text("""
+                UPDATE analysis_results
+                SET label = :label,
+                    confidence = :confidence,
+                    labels = CAST(:labels AS JSONB),
+                    matched_animal_id = :animal_id
+                WHERE id = :id AND created_at = :created_at
+            """), {
+                "id": analysis_id,
+                "created_at": created_at,
+                "label": label,
+                "confidence": confidence,
+                "labels": json.dumps(labels),
+                "animal_id": matched_animal_id
+            })
+
+    # Record a fresh analysis of an unidentified animal.
+    async def update_unidentified_animal(self, unidentified_id: int, created_at: datetime, image_url: str,
+                                         label: str, confidence: float, labels: List[Dict],
+                                         matched_animal_id: Optional[int]) -> None:
+        """
+        Update a pending unidentified_animals row with a new label.
+        If the label now matches a catalog animal, the row is marked 'resolved'
+        and the analysis_results rows of the same image are linked to that animal.
+        Those rows are saved after the unidentified row, so created_at also
+        bounds the analysis_results partitions that are scanned.
+        """
+        async with self.transaction() as session:
+            await session.execute(text("""
+                UPDATE unidentified_animals
+                SET label = :label,
+                    confidence = :confidence,
+                    status = :status
+                WHERE id = :id AND created_at = :created_at
+            """), {
+                "id": unidentified_id,
+                "created_at": created_at,
+                "label": label,
+                "confidence": confidence,
+                "status": "pending" if matched_animal_id is None else "resolved"
+            })
+            await session.execute(text("""
+                UPDATE analysis_results
+                SET label = :label,
+                    confidence = :confidence,
+                    labels = CAST(:labels AS JSONB),
+                    matched_animal_id = :animal_id
+                WHERE image_url = :image_url AND created_at >= :created_at
+            """), {
+                "image_url": image_url,
+                "created_at": created_at,
+                "label": label,
+                "confidence": confidence,
+                "labels": json.dumps(labels),
+                "animal_id": matched_animal_id
+            })
+
+    # Search the animal catalog.
+    async def search_animals(self, q: str, limit: int = 20, cursor: Optional[str] = None) -> Dict:
+        """
+        Ranked, keyset-paginated catalog search.
+        Full-text matches are used when there are any, otherwise trigram
+        similarity finds names with typos among the SEARCH_MAX_CANDIDATES
+        nearest names and species. Results are cached per query.
+
+        Raises:
+            ValueError: if the cursor is invalid
+        """
+        q = " ".join(q.split())
+        cache_key = (q.lower(), limit, cursor)
+        cached = self.catalog.search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if cursor:
+            match, after_rank, after_id = decode_search_cursor(cursor)
+        else:
+            match, after_rank, after_id = "fulltext", float("inf"), 0
+        params = {
+            "q": q,
+            "limit": limit + 1,  # one extra row tells if there is a next page
+            "max_candidates": settings.SEARCH_MAX_CANDIDATES,
+            "after_rank": after_rank,
+            "after_id": after_id
+        }
+        async with self.session_maker() as session:
+            result = await session.execute(SEARCH_QUERIES[match], params)
+            rows = result.all()
+            if not rows and not cursor:
+                match = "fuzzy"
+                result = await session.execute(SEARCH_ANIMALS_FUZZY, params)
+                rows = result.all()
+
+        has_more = len(rows) > limit
+        last = rows[limit - 1] if has_more else None
+        response = {
+            "query": q,
+            "match": match,
+            "limit": limit,
+            "next_cursor": encode_search_cursor(match, last.rank, last.id) if last else None,
+            "results": [
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "species": row.species,
+                    "habitat": row.habitat,
+                    "diet": row.diet,
+                    "description": row.description,
+                    "rank": round(float(row.rank), 4)
+                }
+                for row in rows[:limit]
+            ]
+        }
+        self.catalog.search_cache.set(cache_key, response)
+        return response
+
+    # Bulk import animals into the catalog.
+    async def import_animals(self, records) -> int:
+        """
+        Load catalog records with COPY into a staging table and merge them
+        into animals with a single upsert. The catalog cache is swapped only
+        after the merge has committed.
+
+        Args:
+            records: iterable of (name, species, habitat, diet, description) tuples
+
+        Returns:
+            int: number of inserted or updated animals
+        """
+        async with engine.connect() as conn:
+            raw_connection = await conn.get_raw_connection()
+            pg = raw_connection.driver_connection  # asyncpg connection, COPY is not exposed by SQLAlchemy
+
+            async with pg.transaction():
+                await pg.execute("""
+                    CREATE TEMP TABLE animals_staging (
+                        seq BIGSERIAL,
+                        name VARCHAR(100) NOT NULL,
+                        species VARCHAR(100),
+                        habitat TEXT,
+                        diet TEXT,
+                        description TEXT
+                    ) ON COMMIT DROP
+                """)
+                copied = await pg.copy_records_to_table(
+                    "animals_staging",
+                    records=records,
+                    columns=list(ANIMAL_COLUMNS)
+                )
+                status = await pg.execute(MERGE_STAGED_ANIMALS)
+                merged = int(status.split()[-1])  # "INSERT 0 <count>"
+
+        logger.info(f"Animal import: staged {copied.split()[-1]} rows, merged {merged} animals")
+        await self.catalog.reload()
+        return merged
+
 # Database instance
 database = Database()  
@@ -0,0 +1,6 @@
+"""
+Maintenance jobs for the Animal Lens backend.
+
+Each module is a command line entry point, e.g.
+    python -m app.jobs.rerank
+"""
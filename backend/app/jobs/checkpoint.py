@@ -0,0 +1,70 @@
+"""
+Reprocess Checkpoint Module
+
+Progress file of app.jobs.reprocess, one entry per table:
+    {"unidentified_animals": {"last_id": 1200, "failed": [1031, 1187]}, ...}
+
+- last_id: low watermark, every id up to it has been handled
+- failed: ids up to the watermark whose reprocessing failed, retried by the next run
+"""
+
+import json
+import os
+from collections import deque
+from typing import Iterable
+
+
+class Checkpoint:
+    """
+    Low watermark of processed ids and the set of failed ids, per table.
+    Rows finish out of order, so the watermark only advances past an id
+    once every id dispatched before it has finished too. A failed id is
+    added to `failed` before the watermark moves past it, and both are
+    written in the same file, so a failure is never lost on resume.
+    """
+
+    def __init__(self, path: str, table: str, reset: bool = False):
+        self.path = path
+        self.table = table
+        # always load the whole file, other tables keep their progress on reset
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.state = json.load(file)
+        entry = {} if reset else self.state.get(table, {})
+        if isinstance(entry, int):
+            entry = {"last_id": entry}  # files written before failed ids were tracked
+        self.last_id = entry.get("last_id", 0)
+        self.failed = set(entry.get("failed", []))
+        self._dispatched = deque()
+        self._finished = set()
+
+    def start(self, row_id: int):
+        """Register a new row (id above the watermark, ascending order)"""
+        self._dispatched.append(row_id)
+
+    def finish(self, row_id: int, ok: bool = True):
+        """Mark a row as handled, `ok=False` keeps it for the next run"""
+        if ok:
+            self.failed.discard(row_id)
+        else:
+            self.failed.add(row_id)
+
+        if not self._dispatched or row_id < self._dispatched[0]:
+            return  # retry of an earlier failure, already below the watermark
+        self._finished.add(row_id)
+        while self._dispatched and self._dispatched[0] in self._finished:
+            self._finished.remove(self._dispatched[0])
+            self.last_id = self._dispatched.popleft()
+
+    def forget(self, row_ids: Iterable[int]):
+        """Drop failed ids that no longer need reprocessing (deleted or resolved rows)"""
+        self.failed.difference_update(row_ids)
+
+    def save(self):
+        self.state[self.table] = {"last_id": self.last_id, "failed": sorted(self.failed)}
+        # write to a temp file first so a crash never leaves a truncated checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,42 @@
+"""
+Animal Catalog Import Job
+
+Loads species records from a CSV (with header) or JSONL file into `animals`
+through COPY and a single upsert (see Database.import_animals).
+Existing animals with the same name are updated.
+
+Usage:
+    python -m app.jobs.import_animals animals.csv
+    python -m app.jobs.import_animals animals.jsonl
+
+Running API processes pick up the new catalog on their next background
+refresh (CATALOG_CACHE_TTL). Use POST /api/admin/animals/import to make the
+receiving process swap its cache immediately.
+"""
+
+import argparse
+import asyncio
+from ..catalog import read_animal_records, detect_format
+from ..database import database
+from ..logger import logger
+
+
+async def import_file(path: str, file_format: str = None) -> int:
+    file_format = file_format or detect_format(path)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as stream:
+        merged = await database.import_animals(read_animal_records(stream, file_format))
+    logger.info(f"Imported {merged} animals from {path}")
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import animals into the catalog")
+    parser.add_argument("path", help="CSV or JSONL file")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="override format detection")
+    args = parser.parse_args()
+
+    asyncio.run(import_file(args.path, args.format))
+
+
+if __name__ == "__main__":
+    main()
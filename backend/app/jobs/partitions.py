@@ -0,0 +1,191 @@
+"""
+Partition Maintenance Job
+
+Maintains the monthly partitions of analysis_results and unidentified_animals
+(see db/migrations/004_partition_by_month.sql).
+
+Usage:
+    python -m app.jobs.partitions ensure --months-ahead 3
+    python -m app.jobs.partitions retain --keep-months 12 [--dry-run]
+
+ensure: creates the partitions of the current month and the next months.
+        The API runs it on startup and every PARTITION_ENSURE_INTERVAL seconds
+        (see ensure_periodically), so no cron job is needed. Rows that landed in
+        <table>_default in the meantime are moved into the new partition.
+retain: for every partition older than --keep-months: detach it, export it
+        as gzip compressed CSV to the private archive storage
+        (<table>/<partition>.csv.gz in ARCHIVE_S3_BUCKET or LOCAL_ARCHIVE_ROOT),
+        then drop it. A partition that was detached but not yet archived
+        (e.g. after a crash) is picked up again by the next run.
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import re
+import tempfile
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from ..database import engine
+from ..logger import logger
+from ..services.storage import get_storage
+
+PARTITIONED_TABLES = ("analysis_results", "unidentified_animals")
+
+# Partition DDL gives up after this long instead of queueing behind a long reader
+# (reprocess cursor, retention COPY) while uploads and reads queue behind the DDL
+LOCK_TIMEOUT = "5s"
+
+
+def month_start(months_ago: int) -> date:
+    """First day of the month `months_ago` months before the current one"""
+    today = date.today()
+    index = today.year * 12 + today.month - 1 - months_ago
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def ensure_partitions(months_ahead: int = 3) -> dict:
+    """
+    Create missing monthly partitions.
+
+    Returns:
+        dict: number of partitions created per table, None for a table that was
+              skipped (locked by another process, or lock timeout) and is retried by the next run
+    """
+    created = {}
+    for table in PARTITIONED_TABLES:
+        # one transaction per table, a failure on one table does not block the other
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                # API processes run this concurrently, only one of them creates the partitions
+                locked = await conn.execute(
+                    text("SELECT pg_try_advisory_xact_lock(hashtext(:parent))"), {"parent": table}
+                )
+                if not locked.scalar():
+                    created[table] = None
+                    continue
+                result = await conn.execute(
+                    text("SELECT create_monthly_partitions(:parent, :months_ahead)"),
+                    {"parent": table, "months_ahead": months_ahead}
+                )
+                created[table] = result.scalar()
+        except DBAPIError as e:
+            logger.warning(f"Partition maintenance of {table} skipped, retried on the next run: {e}")
+            created[table] = None
+    logger.info(f"Partitions created: {created}")
+    return created
+
+
+async def ensure_periodically(interval: int, months_ahead: int = 3):
+    """Background task of the API: ensure_partitions now and then every `interval` seconds"""
+    while True:
+        try:
+            await ensure_partitions(months_ahead)
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(interval)
+
+
+async def expired_partitions(conn, table: str, cutoff: date) -> list:
+    """
+    Monthly partitions of `table` that end on or before `cutoff`.
+
+    Returns:
+        list: [(partition_name, attached)] oldest first
+    """
+    pattern = re.compile(rf"^{table}_p(\d{{4}})(\d{{2}})$")
+    result = await conn.execute(text("""
+        SELECT c.relname, EXISTS (
+            SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid
+        ) AS attached
+        FROM pg_class c
+        WHERE c.relkind = 'r' AND c.relname LIKE :prefix
+        ORDER BY c.relname
+    """), {"prefix": f"{table}_p%"})
+
+    expired = []
+    for row in result.all():
+        match = pattern.match(row.relname)
+        if not match:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        partition_end = date(year + month // 12, month % 12 + 1, 1)
+        if partition_end <= cutoff:
+            expired.append((row.relname, row.attached))
+    return expired
+
+
+async def export_partition(partition: str, path: str) -> None:
+    """COPY a partition into a gzip compressed CSV file"""
+    async with engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        pg = raw_connection.driver_connection  # asyncpg connection, COPY is not exposed by SQLAlchemy
+
+        with gzip.open(path, 'wb') as archive:
+            async def write(chunk):
+                archive.write(chunk)
+
+            await pg.copy_from_table(partition, output=write, format='csv', header=True)
+
+
+async def archive_partition(table: str, partition: str, attached: bool) -> str:
+    """Detach, export to storage and drop one partition, returns the storage key"""
+    if attached:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{partition}"'))
+        logger.info(f"Detached {partition} from {table}")
+
+    fd, path = tempfile.mkstemp(suffix=".csv.gz")
+    os.close(fd)
+    try:
+        await export_partition(partition, path)
+        key = await get_storage().save_archive(f"{table}/{partition}.csv.gz", path, "application/gzip")
+    finally:
+        os.remove(path)
+
+    # only drop once the archive is stored
+    async with engine.begin() as conn:
+        await conn.execute(text(f'DROP TABLE "{partition}"'))
+    logger.info(f"Archived {partition} to {key} and dropped it")
+    return key
+
+
+async def apply_retention(keep_months: int = 12, dry_run: bool = False) -> list:
+    """Archive every partition older than `keep_months` full months"""
+    cutoff = month_start(keep_months)
+    archived = []
+    for table in PARTITIONED_TABLES:
+        async with engine.connect() as conn:
+            expired = await expired_partitions(conn, table, cutoff)
+        for partition, attached in expired:
+            if dry_run:
+                logger.info(f"Would archive {partition} (attached={attached})")
+                continue
+            archived.append(await archive_partition(table, partition, attached))
+    logger.info(f"Retention finished, cutoff {cutoff}: {len(archived)} partitions archived")
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ensure_parser = subparsers.add_parser("ensure", help="create upcoming partitions")
+    ensure_parser.add_argument("--months-ahead", type=int, default=3)
+
+    retain_parser = subparsers.add_parser("retain", help="archive and drop old partitions")
+    retain_parser.add_argument("--keep-months", type=int, default=12, help="full months kept besides the current one")
+    retain_parser.add_argument("--dry-run", action="store_true", help="only list the partitions to archive")
+
+    args = parser.parse_args()
+    if args.command == "ensure":
+        asyncio.run(ensure_partitions(args.months_ahead))
+    else:
+        asyncio.run(apply_retention(args.keep_months, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
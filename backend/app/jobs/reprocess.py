@@ -0,0 +1,243 @@
+"""
+Bulk Reprocessing Job
+
+Sends historical images through Rekognition again and stores the new analysis.
+Use it after adding animals to the catalog, to resolve the backlog of
+`unidentified_animals` or to fill `labels` for old `analysis_results` rows.
+(If the rows already have stored labels, app.jobs.rerank is free of AWS costs.)
+
+Usage:
+    python -m app.jobs.reprocess --table unidentified_animals --concurrency 8 --max-aws-calls 1000
+    python -m app.jobs.reprocess --table analysis_results --only-missing-labels --until 2025-01-01
+
+Features:
+- Rows are streamed with a server-side cursor in id order
+- Bounded number of concurrent Rekognition calls
+- Progress checkpoint file (app/jobs/checkpoint.py), the next run resumes after
+  the last finished id and first retries the rows that failed
+- AWS call budget per run
+- Periodic throughput report
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from sqlalchemy import select, text
+from ..database import database, engine
+from ..models import AnalysisResult
+from ..labels import select_label, compact_labels
+from ..logger import logger
+from ..services.rekognition_service import rekognition_service
+from .checkpoint import Checkpoint
+
+TABLES = ("unidentified_animals", "analysis_results")
+
+
+def build_query(table: str, last_id: int, until: datetime = None, only_missing_labels: bool = False,
+                retry_ids: list = None):
+    """
+    Select the rows to reprocess, ordered by id.
+    Starts after the checkpoint, or selects exactly `retry_ids` (failed rows of earlier runs).
+    """
+    if table == "analysis_results":
+        query = (
+            select(AnalysisResult.id, AnalysisResult.created_at, AnalysisResult.image_url)
+            .order_by(AnalysisResult.id)
+        )
+        if retry_ids is not None:
+            return query.where(AnalysisResult.id.in_(retry_ids)), {}
+        query = query.where(AnalysisResult.id > last_id)
+        if until:
+            query = query.where(AnalysisResult.created_at < until)
+        if only_missing_labels:
+            query = query.where(AnalysisResult.labels.is_(None))
+        return query, {}
+
+    if retry_ids is not None:
+        sql = """
+            SELECT id, created_at, image_url
+            FROM unidentified_animals
+            WHERE status = 'pending' AND id = ANY(:retry_ids)
+            ORDER BY id
+        """
+        return text(sql), {"retry_ids": retry_ids}
+
+    sql = """
+        SELECT id, created_at, image_url
+        FROM unidentified_animals
+        WHERE status = 'pending' AND id > :last_id
+    """
+    params = {"last_id": last_id}
+    if until:
+        sql += " AND created_at < :until"
+        params["until"] = until
+    sql += " ORDER BY id"
+    return text(sql), params
+
+
+async def process_row(table: str, row, stats: dict):
+    """Rekognition -> label selection -> catalog match -> update, for one row"""
+    labels = await rekognition_service.detect_labels(row.image_url)
+    stats["aws_calls"] += 1
+
+    stored_labels = compact_labels(labels)
+    selected = select_label(labels)
+    animal_id = await database.find_animal_id(selected["name"]) if selected else None
+    if animal_id:
+        stats["matched"] += 1
+
+    if table == "analysis_results":
+        await database.update_analysis_result(
+            analysis_id=row.id,
+            created_at=row.created_at,
+            label=selected["name"] if selected else None,
+            confidence=selected["confidence"] if selected else None,
+            labels=stored_labels,
+            matched_animal_id=animal_id
+        )
+    elif selected:
+        await database.update_unidentified_animal(
+            unidentified_id=row.id,
+            created_at=row.created_at,
+            image_url=row.image_url,
+            label=selected["name"],
+            confidence=selected["confidence"],
+            labels=stored_labels,
+            matched_animal_id=animal_id
+        )
+
+
+def log_progress(stats: dict, started: float, checkpoint: Checkpoint):
+    elapsed = time.monotonic() - started
+    rate = stats["processed"] / elapsed if elapsed else 0
+    logger.info(
+        f"Reprocess {checkpoint.table}: {stats['processed']} rows in {elapsed:.1f}s "
+        f"({rate:.1f} rows/s), aws_calls={stats['aws_calls']}, matched={stats['matched']}, "
+        f"errors={stats['errors']}, checkpoint id={checkpoint.last_id}, failed={len(checkpoint.failed)}"
+    )
+
+
+async def reprocess(table: str, concurrency: int = 8, max_aws_calls: int = 0,
+                    checkpoint_path: str = ".reprocess_checkpoint.json", reset: bool = False,
+                    until: datetime = None, only_missing_labels: bool = False,
+                    report_interval: float = 10.0) -> dict:
+    """
+    Reprocess the rows of one table.
+
+    Args:
+        table: "unidentified_animals" or "analysis_results"
+        concurrency: number of rows processed at the same time
+        max_aws_calls: stop dispatching after this many Rekognition calls (0 = unlimited)
+        checkpoint_path: JSON file used to resume after a crash
+        reset: ignore the saved checkpoint of this table and start from the first row
+        until: only rows created before this time
+        only_missing_labels: analysis_results only, skip rows that already have labels
+
+    Returns:
+        dict: counters {"processed", "aws_calls", "matched", "errors"}
+    """
+    checkpoint = Checkpoint(checkpoint_path, table, reset=reset)
+    stats = {"processed": 0, "aws_calls": 0, "matched": 0, "errors": 0}
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    started = time.monotonic()
+    logger.info(f"Reprocessing {table} after id {checkpoint.last_id}, retrying {len(checkpoint.failed)} failed rows")
+
+    async def worker():
+        while True:
+            row = await queue.get()
+            if row is None:
+                queue.task_done()
+                return
+            ok = False
+            try:
+                await process_row(table, row, stats)
+                ok = True
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"Failed to reprocess {table} id={row.id}: {e}")
+            finally:
+                stats["processed"] += 1
+                # failed rows stay in the checkpoint and are retried by the next run
+                checkpoint.finish(row.id, ok=ok)
+                queue.task_done()
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(report_interval)
+            checkpoint.save()
+            log_progress(stats, started, checkpoint)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    report_task = asyncio.create_task(reporter())
+    try:
+        dispatched = 0
+        budget_reached = False
+        async with engine.connect() as conn:
+            # failed rows of earlier runs first, they sit below the watermark
+            retry_ids = sorted(checkpoint.failed)
+            if retry_ids:
+                query, params = build_query(table, checkpoint.last_id, retry_ids=retry_ids)
+                rows = (await conn.execute(query, params)).all()
+                checkpoint.forget(set(retry_ids) - {row.id for row in rows})
+                for row in rows:
+                    if max_aws_calls and dispatched >= max_aws_calls:
+                        budget_reached = True
+                        break
+                    await queue.put(row)
+                    dispatched += 1
+
+            if not budget_reached:
+                query, params = build_query(table, checkpoint.last_id, until, only_missing_labels)
+                # stream() keeps a server-side cursor open, rows are fetched in chunks
+                result = await conn.stream(query.execution_options(yield_per=500), params)
+                async for row in result:
+                    if max_aws_calls and dispatched >= max_aws_calls:
+                        budget_reached = True
+                        break
+                    checkpoint.start(row.id)
+                    await queue.put(row)
+                    dispatched += 1
+        if budget_reached:
+            logger.info(f"AWS call budget of {max_aws_calls} reached, stopping")
+
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        report_task.cancel()
+        for task in workers:
+            task.cancel()
+        checkpoint.save()
+        log_progress(stats, started, checkpoint)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocess historical images with Rekognition")
+    parser.add_argument("--table", choices=TABLES, default="unidentified_animals")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent rows (keep below the DB pool size)")
+    parser.add_argument("--max-aws-calls", type=int, default=0, help="Rekognition call budget, 0 = unlimited")
+    parser.add_argument("--checkpoint", default=".reprocess_checkpoint.json", help="checkpoint file path")
+    parser.add_argument("--reset", action="store_true", help="ignore this table's checkpoint and start over")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="only rows created before this date")
+    parser.add_argument("--only-missing-labels", action="store_true",
+                        help="analysis_results: only rows saved without a label set")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="seconds between progress reports")
+    args = parser.parse_args()
+
+    asyncio.run(reprocess(
+        table=args.table,
+        concurrency=args.concurrency,
+        max_aws_calls=args.max_aws_calls,
+        checkpoint_path=args.checkpoint,
+        reset=args.reset,
+        until=args.until,
+        only_missing_labels=args.only_missing_labels,
+        report_interval=args.report_interval
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Re-ranking Job
+
+Recomputes `label`, `confidence` and `matched_animal_id` of historical
+`analysis_results` rows from their stored Rekognition label sets.
+Nothing is sent to AWS: run it after changing the rules in app/labels.py
+or after adding animals to the catalog.
+
+Usage:
+    python -m app.jobs.rerank [--batch-size 5000] [--since 2025-01-01] [--dry-run]
+
+--since limits the job to recent rows; Postgres then only scans the
+matching monthly partitions. Each batch update is also bounded by the
+created_at range of its rows, so it only touches their partitions.
+
+Rows saved before the `labels` column existed (labels IS NULL) are skipped.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from sqlalchemy import select, text
+from ..database import engine
+from ..models import AnalysisResult
+from ..labels import select_label
+from ..logger import logger
+
+# Update a whole batch in one statement.
+# Matching follows Database.save_analysis_result (animal name ILIKE label).
+UPDATE_BATCH = text("""
+    WITH v AS (
+        SELECT
+            r.id,
+            r.label,
+            r.confidence,
+            (
+                SELECT a.id
+                FROM animals a
+                WHERE a.name ILIKE '%' || r.label || '%'
+                ORDER BY a.id
+                LIMIT 1
+            ) AS animal_id
+        FROM jsonb_to_recordset(CAST(:rows AS JSONB))
+            AS r(id INTEGER, created_at TIMESTAMP, label TEXT, confidence NUMERIC)
+    )
+    UPDATE analysis_results AS ar
+    SET label = v.label,
+        confidence = v.confidence,
+        matched_animal_id = v.animal_id
+    FROM v
+    WHERE ar.id = v.id
+      AND ar.created_at = v.created_at
+      AND ar.created_at BETWEEN :batch_since AND :batch_until
+      AND (ar.label IS DISTINCT FROM v.label
+           OR ar.matched_animal_id IS DISTINCT FROM v.animal_id)
+""")
+
+
+async def rerank(batch_size: int = 5000, dry_run: bool = False, since: datetime = None) -> dict:
+    """
+    Walk analysis_results in id order (keyset pagination) and re-select
+    the label of every row from its stored label set.
+
+    Returns:
+        dict: counters {"scanned", "skipped", "updated"}
+    """
+    stats = {"scanned": 0, "skipped": 0, "updated": 0}
+    last_id = 0
+    started = time.monotonic()
+
+    while True:
+        async with engine.begin() as conn:
+            query = (
+                select(AnalysisResult.id, AnalysisResult.created_at, AnalysisResult.labels)
+                .where(AnalysisResult.labels.isnot(None), AnalysisResult.id > last_id)
+                .order_by(AnalysisResult.id)
+                .limit(batch_size)
+            )
+            if since:
+                query = query.where(AnalysisResult.created_at >= since)
+            result = await conn.execute(query)
+            rows = result.all()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                selected = select_label(row.labels)
+                if selected is None:
+                    # no label passes the current rules - keep the old selection
+                    stats["skipped"] += 1
+                    continue
+                updates.append({
+                    "id": row.id,
+                    "created_at": row.created_at.isoformat(),
+                    "label": selected["name"],
+                    "confidence": selected["confidence"],
+                })
+
+            stats["scanned"] += len(rows)
+            last_id = rows[-1].id
+
+            if updates and not dry_run:
+                update_result = await conn.execute(UPDATE_BATCH, {
+                    "rows": json.dumps(updates),
+                    "batch_since": min(row.created_at for row in rows),
+                    "batch_until": max(row.created_at for row in rows)
+                })
+                stats["updated"] += update_result.rowcount
+
+        logger.info(f"Re-ranked up to id {last_id}: {stats}")
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Re-ranking finished in {elapsed:.1f}s "
+        f"({stats['scanned'] / elapsed if elapsed else 0:.0f} rows/s): {stats}"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-rank stored Rekognition labels")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="scan without writing")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only rows created at or after this date")
+    args = parser.parse_args()
+
+    asyncio.run(rerank(batch_size=args.batch_size, dry_run=args.dry_run, since=args.since))
+
+
+if __name__ == "__main__":
+    main()
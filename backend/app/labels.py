@@ -0,0 +1,77 @@
+"""
+Label Selection Module
+
+This module decides which Rekognition label describes the animal in an image.
+It has no AWS or database dependencies so the same rules can be applied to
+fresh uploads and to label sets stored in `analysis_results.labels`.
+
+Features:
+- Generic label filtering (Animal, Mammal, ...)
+- Priority ordering for specific breeds
+- Compact label serialization for storage
+"""
+
+# Exclude generic labels
+GENERIC_LABELS = {
+    'Animal', 'Mammal', 'Wildlife', 'Pet', 'Fauna',
+    'Canine',  # Additional: more general classification
+    'Carnivore',
+    'Feline', 'Face'
+}
+
+# Label priority (more specific order)
+PRIORITY_LABELS = [
+    'Golden Retriever', 'Labrador', 'Poodle',  # More specific breeds
+    'Dog',  # General species
+    'Puppy'  # 기타
+]
+
+# Minimum confidence for a label to be considered
+MIN_CONFIDENCE = 80
+
+
+def select_label(labels: list):
+    """
+    Select the most specific animal label from a Rekognition label list.
+
+    Args:
+        labels (list): [{"name": ..., "confidence": ..., "parents": [...]}, ...]
+
+    Returns:
+        dict | None: the selected label, or None if no specific animal was found
+    """
+    # Filter high confidence labels
+    high_confidence_labels = [
+        label for label in labels
+        if label["confidence"] >= MIN_CONFIDENCE and
+        label["name"] not in GENERIC_LABELS
+    ]
+    if not high_confidence_labels:
+        return None
+
+    # Select label based on priority
+    for priority_name in PRIORITY_LABELS:
+        matching_labels = [
+            label for label in high_confidence_labels
+            if label["name"] == priority_name
+        ]
+        if matching_labels:
+            return max(matching_labels, key=lambda x: x["confidence"])
+
+    # If no priority label, select the highest confidence label
+    return max(high_confidence_labels, key=lambda x: x["confidence"])
+
+
+def compact_labels(labels: list) -> list:
+    """
+    Reduce a label list to the fields stored in the `labels` JSONB column.
+    Confidence is rounded to 2 decimals to match the DECIMAL(5, 2) columns.
+    """
+    return [
+        {
+            "name": label["name"],
+            "confidence": round(float(label["confidence"]), 2),
+            "parents": list(label.get("parents", [])),
+        }
+        for label in labels
+    ]
@@ -1,14 +1,20 @@
-from fastapi import FastAPI, UploadFile, HTTPException, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import FastAPI, UploadFile, HTTPException, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from .database import database, AsyncSessionLocal
-from sqlalchemy.orm import joinedload
+from fastapi.responses import StreamingResponse, FileResponse, ORJSONResponse
+from .database import database
 from .config import settings
 from .logger import logger  # 이것만 사용
 from PIL import Image
 import io
-from sqlalchemy import text, select
-from .models import AnalysisResult
+import asyncio
+from sqlalchemy import text
+from .labels import select_label, compact_labels
+from .catalog import read_animal_records, detect_format
+from .profiling import ProfilingMiddleware, ProfileStore
+from .schemas import AnalysisResultResponse, AnimalSearchResponse
+from .jobs.partitions import ensure_periodically
+import hmac
+from typing import Optional
 
 """
 FastAPI Main Application File
@@ -37,9 +43,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request profiling, only installed when enabled (no overhead otherwise)
+profile_store = None
+if settings.PROFILING_ENABLED:
+    profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+    app.add_middleware(ProfilingMiddleware, store=profile_store, token=settings.ADMIN_TOKEN)
+
 # Initialize services
-from .services.s3_service import s3_service
-from .services import rekognition_service
+from .services import get_storage, rekognition_service
+from .services.local_storage import LocalStorage
+storage = get_storage()
+
+# Monthly partitions are created by the API itself, no cron job is needed
+partition_task = None
+
+@app.on_event("startup")
+async def start_partition_maintenance():
+    global partition_task
+    if settings.PARTITION_ENSURE_INTERVAL > 0:
+        partition_task = asyncio.create_task(
+            ensure_periodically(settings.PARTITION_ENSURE_INTERVAL, settings.PARTITION_MONTHS_AHEAD)
+        )
+
+@app.on_event("shutdown")
+async def stop_partition_maintenance():
+    if partition_task is not None:
+        partition_task.cancel()
 
 @app.get("/")
 async def root():
@@ -68,9 +97,13 @@ async def upload_image(file: UploadFile):
         
         logger.info(f"Processing upload: {file.filename}, size: {len(contents)}")
         
-        # Upload to S3
-        image_url = await s3_service.upload_file(contents, file.filename)
-        logger.info(f"Uploaded to S3: {image_url}")
+        # Upload to storage (S3 or local disk); the stored type comes from the bytes,
+        # never from the client's filename or Content-Type
+        try:
+            image_url = await storage.upload_file(contents)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        logger.info(f"Uploaded to storage: {image_url}")
         
         # Rekognition analysis
         labels = await rekognition_service.detect_labels(image_url)
@@ -80,6 +113,8 @@ async def upload_image(file: UploadFile):
         result = await process_analysis_results(image_url, labels)
         return result
         
+    except HTTPException:
+        raise  # validation errors keep their status code
     except Exception as e:
         logger.error(f"Upload failed: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,50 +127,18 @@ async def process_analysis_results(image_url: str, labels: list) -> dict:
     logger.debug(f"Image URL: {image_url}")
     logger.debug(f"All labels: {labels}")
     
-    # Exclude generic labels
-    GENERIC_LABELS = {
-        'Animal', 'Mammal', 'Wildlife', 'Pet', 'Fauna',
-        'Canine',  # Additional: more general classification
-        'Carnivore',
-        'Feline','Face'
-    }
-    
-    # Label priority (more specific order)
-    PRIORITY_LABELS = [
-        'Golden Retriever', 'Labrador', 'Poodle',  # More specific breeds
-        'Dog',  # General species
-        'Puppy'  # 기타
-    ]
+    # Select the most specific animal label (see app/labels.py)
+    selected_label = select_label(labels)
     
-    # Filter high confidence labels
-    high_confidence_labels = [
-        label for label in labels 
-        if label["confidence"] >= 80 and 
-        label["name"] not in GENERIC_LABELS
-    ]
-    logger.info(f"Filtered specific animal labels: {high_confidence_labels}")
-    
-    if not high_confidence_labels:
+    if not selected_label:
         logger.warning("No specific animals detected in image")
         raise HTTPException(400, "No specific animals detected in image")
     
-    # Select label based on priority
-    selected_label = None
-    for priority_name in PRIORITY_LABELS:
-        matching_labels = [
-            label for label in high_confidence_labels 
-            if label["name"] == priority_name
-        ]
-        if matching_labels:
-            selected_label = max(matching_labels, key=lambda x: x["confidence"])
-            break
-    
-    # If no priority label, select the highest confidence label
-    if not selected_label:
-        selected_label = max(high_confidence_labels, key=lambda x: x["confidence"])
-    
     logger.info(f"Selected specific animal: {selected_label}")
     
+    # Keep the full label set so results can be re-ranked without calling Rekognition again
+    stored_labels = compact_labels(labels)
+    
     # Check if animal is known in the database
     is_known_animal = await database.is_animal(selected_label["name"])
     logger.info(f"Database lookup - Animal '{selected_label['name']}' is known: {is_known_animal}")
@@ -146,7 +149,8 @@ async def process_analysis_results(image_url: str, labels: list) -> dict:
             result = await database.save_unidentified_animal(
                 image_url=image_url,
                 label=selected_label["name"],
-                confidence=selected_label["confidence"]
+                confidence=selected_label["confidence"],
+                labels=stored_labels
             )
             logger.info(f"Successfully saved unidentified animal: {result}")  #log
             return result
@@ -159,7 +163,8 @@ async def process_analysis_results(image_url: str, labels: list) -> dict:
         result = await database.save_analysis_result(
             image_url=image_url,
             label=selected_label["name"],
-            confidence=selected_label["confidence"]
+            confidence=selected_label["confidence"],
+            labels=stored_labels
         )
         return {
             # Same as Unknown Animal, use 'analysis_id' key
@@ -178,55 +183,106 @@ async def process_analysis_results(image_url: str, labels: list) -> dict:
         return await database.save_unidentified_animal(
             image_url=image_url,
             label=selected_label["name"],
-            confidence=selected_label["confidence"]
+            confidence=selected_label["confidence"],
+            labels=stored_labels
         )
 
 @app.get("/api/test")
 async def test_connection():
     return {"status": "ok", "message": "Backend is running"}
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
-
-@app.get("/api/results/{result_id}")
-async def get_analysis_result(result_id: int, db: AsyncSession = Depends(get_db)):
-    # 1) Query AnalysisResult while joinedload matched_animal
-    query = (
-        select(AnalysisResult)
-        .options(joinedload(AnalysisResult.matched_animal))  
-        .where(AnalysisResult.id == result_id)
+@app.get("/api/results/{result_id}", response_model=AnalysisResultResponse)
+async def get_analysis_result(result_id: int):
+    """
+    Analysis result with its matched animal.
+    Returned as an ORJSONResponse directly, skipping the response_model pass
+    (the model documents the shape).
+    """
+    analysis = await database.get_analysis_result(result_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return ORJSONResponse(analysis)
+
+@app.get("/api/images/{key:path}")
+async def get_image(key: str):
+    """
+    Serve an image stored by the local storage backend.
+    With S3 storage images are served by S3 directly.
+    """
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        media_type = storage.media_type(key)  # only image extensions are served
+        chunks = storage.iter_chunks(key)
+        first_chunk = next(chunks)  # opens the file, so missing keys fail here with 404
+    except (ValueError, FileNotFoundError, StopIteration):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    def content():
+        yield first_chunk
+        yield from chunks
+
+    return StreamingResponse(
+        content(), media_type=media_type, headers={"X-Content-Type-Options": "nosniff"}
     )
 
-    # 2) Execute query and get one AnalysisResult object
-    result = await db.execute(query)
-    analysis = result.scalar_one_or_none()
+@app.get("/api/animals/search", response_model=AnimalSearchResponse)
+async def search_animals(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, max_length=200)
+):
+    """
+    Search the animal catalog by name, species, habitat and description.
+    Results are ranked by relevance; "match" is "fuzzy" when no word matched
+    and similar names are returned instead. Pass "next_cursor" of a response
+    as "cursor" to get the next page.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query must not be empty")
+    try:
+        return ORJSONResponse(await database.search_animals(q, limit=limit, cursor=cursor))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if not analysis:
-        raise HTTPException(status_code=404, detail="Result not found")
+def require_admin(x_admin_token: str = Header(default="")):
+    """Allow the request only with a valid X-Admin-Token header"""
+    if not settings.ADMIN_TOKEN or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
 
-    # 3) Create matched_animal data
-    matched_animal_data = None
-    if analysis.matched_animal:
-        matched_animal_data = {
-            "id": analysis.matched_animal.id,
-            "name": analysis.matched_animal.name,
-            "species": analysis.matched_animal.species,
-            "habitat": analysis.matched_animal.habitat,
-            "diet": analysis.matched_animal.diet,
-            "description": analysis.matched_animal.description
-        }
+@app.post("/api/admin/animals/import", dependencies=[Depends(require_admin)])
+async def import_animals(file: UploadFile):
+    """
+    Bulk import animals from a CSV (with header) or JSONL file.
+    Columns: name, species, habitat, diet, description. Existing names are updated.
+    """
+    try:
+        file_format = detect_format(file.filename)
+        stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        merged = await database.import_animals(read_animal_records(stream, file_format))
+        return {"status": "ok", "imported": merged}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await file.close()
 
-    # 4) Configure JSON response
-    return {
-        "id": analysis.id,
-        "image_url": analysis.image_url,
-        "label": analysis.label,
-        "confidence": analysis.confidence,
-        "created_at": analysis.created_at,
-        # Include Animal information
-        "matched_animal": matched_animal_data
-    }
+@app.get("/api/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List recent request profiles, newest first"""
+    if profile_store is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return {"profiles": profile_store.list()}
+
+@app.get("/api/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """Download a profile in pstats format (python -m pstats <file>, snakeviz, ...)"""
+    if profile_store is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    try:
+        path = profile_store.profile_path(profile_id)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
 
 @app.get("/api/db-test")
 async def test_db_connection():
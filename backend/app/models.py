@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -10,21 +11,37 @@ class Animal(Base):
     __tablename__ = "animals"
     
     id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, unique=True)
     species = Column(String(100))
     habitat = Column(String)
     diet = Column(String)
     description = Column(String)
 
 # AnalysisResult model
+# partitioned by month on created_at (db/migrations/004_partition_by_month.sql),
+# so created_at is part of the primary key
 class AnalysisResult(Base):
     __tablename__ = "analysis_results"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
     
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     image_url = Column(String, nullable=False)
     label = Column(String(100))
     confidence = Column(Float)
     matched_animal_id = Column(Integer, ForeignKey("animals.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    labels = Column(JSONB)  # full Rekognition label set: [{"name", "confidence", "parents"}]
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    matched_animal = relationship("Animal", backref="analysis_results")
 
-    matched_animal = relationship("Animal", backref="analysis_results") 
\ No newline at end of file
+# UnidentifiedAnimal model (partitioned like analysis_results)
+class UnidentifiedAnimal(Base):
+    __tablename__ = "unidentified_animals"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    label = Column(String(100), nullable=False)
+    confidence = Column(Float)
+    image_url = Column(String, nullable=False)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    status = Column(String(50), default="pending")  # pending, approved, rejected, resolved 
\ No newline at end of file
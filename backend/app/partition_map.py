@@ -0,0 +1,113 @@
+"""
+Partition Id Map Module
+
+Lets id lookups on the monthly partitioned tables (analysis_results,
+unidentified_animals) scan one or two partitions instead of all of them.
+
+Features:
+- First id of every monthly partition, loaded per process
+- ids come from a sequence and grow with created_at, so an id belongs to the
+  last partition whose first id is <= id (or, for rows saved around a month
+  boundary, to the month before)
+- Background refresh after MAP_TTL seconds, like the animal catalog
+"""
+
+import asyncio
+import bisect
+import re
+import time
+from datetime import date, datetime
+from typing import Optional, Tuple
+from sqlalchemy import text
+from .logger import logger
+
+# Seconds before the map is reloaded in the background
+MAP_TTL = 60
+
+# created_at bounds that select every partition
+UNBOUNDED = (datetime.min, datetime.max)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class PartitionIdMap:
+    """Maps ids of one partitioned table to created_at bounds"""
+
+    def __init__(self, engine, table: str, ttl: int = MAP_TTL):
+        self.engine = engine
+        self.table = table
+        self.ttl = ttl
+        self._pattern = re.compile(rf"^{table}_p(\d{{4}})(\d{{2}})$")
+        # parallel tuples, ascending: first id of a partition and its month
+        self._first_ids: Tuple[int, ...] = ()
+        self._months: Tuple[date, ...] = ()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+
+    async def bounds(self, row_id: int) -> Tuple[datetime, datetime]:
+        """
+        created_at range [since, until) that contains row_id if it exists.
+        Callers retry with UNBOUNDED when nothing is found (rows in the
+        default partition, partitions created after the last reload).
+        """
+        if self._loaded_at is None:
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Partition id map of {self.table} could not be loaded: {e}")
+                return UNBOUNDED
+        elif time.monotonic() - self._loaded_at > self.ttl and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._background_reload())
+
+        first_ids, months = self._first_ids, self._months
+        position = bisect.bisect_right(first_ids, row_id) - 1
+        if position < 0:
+            return UNBOUNDED
+        since = datetime.combine(_add_months(months[position], -1), datetime.min.time())
+        if position == len(first_ids) - 1:
+            # newest partition with rows: newer partitions may have filled since the last reload
+            return since, datetime.max
+        return since, datetime.combine(_add_months(months[position], 1), datetime.min.time())
+
+    async def reload(self):
+        """Read the first id of every monthly partition"""
+        async with self._lock:
+            async with self.engine.connect() as conn:
+                result = await conn.execute(text("""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass(:table)
+                """), {"table": self.table})
+                partitions = []
+                for (name,) in result.all():
+                    match = self._pattern.match(name)
+                    if match:
+                        partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+
+                entries = []
+                if partitions:
+                    # min(id) of each partition is a single probe of its primary key index
+                    query = " UNION ALL ".join(
+                        f"SELECT CAST('{month.isoformat()}' AS DATE) AS month, (SELECT min(id) FROM \"{name}\") AS first_id"
+                        for name, month in partitions
+                    )
+                    result = await conn.execute(text(query))
+                    entries = sorted((row.first_id, row.month) for row in result.all() if row.first_id is not None)
+
+            self._first_ids = tuple(first_id for first_id, _ in entries)
+            self._months = tuple(month for _, month in entries)
+            self._loaded_at = time.monotonic()
+            logger.debug(f"Partition id map of {self.table}: {len(entries)} partitions with rows")
+
+    async def _background_reload(self):
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Partition id map refresh of {self.table} failed: {e}")
+        finally:
+            self._refresh_task = None
@@ -0,0 +1,158 @@
+"""
+Request Profiling Module
+
+Opt-in cProfile capture for single requests.
+A request is profiled when PROFILING_ENABLED is set and it carries the header
+`X-Profile: <ADMIN_TOKEN>`. Without PROFILING_ENABLED the middleware is not
+installed at all, so normal requests pay nothing.
+
+Features:
+- Profiles only the code of the profiled request: the profiler is switched on
+  each time the request's coroutine resumes and off when it suspends, so other
+  requests served concurrently on the event loop are not mixed in
+- Asyncio timing per request: time running on the event loop vs time waiting
+  (database, AWS, worker threads)
+- Bounded on-disk ring buffer (PROFILE_MAX_FILES), listed and downloaded
+  through /api/profiles
+"""
+
+import asyncio
+import cProfile
+import glob
+import hmac
+import json
+import os
+import re
+import time
+from .logger import logger
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[A-Za-z0-9_.-]+$")
+
+
+class _ProfiledCoroutine:
+    """
+    Awaitable that drives a coroutine step by step with the profiler enabled
+    only while the coroutine itself is running.
+    """
+
+    def __init__(self, coro, profiler: cProfile.Profile):
+        self.coro = coro
+        self.profiler = profiler
+        self.on_loop = 0.0  # seconds spent running on the event loop
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            started = time.perf_counter()
+            self.profiler.enable()
+            try:
+                if error is None:
+                    yielded = self.coro.send(value)
+                else:
+                    yielded = self.coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profiler.disable()
+                self.on_loop += time.perf_counter() - started
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+
+class ProfileStore:
+    """Ring buffer of profiles: <id>.prof (pstats format) + <id>.json (metadata)"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            raise ValueError(f"Invalid profile id: {profile_id}")
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, profile_id: str, profiler: cProfile.Profile, metadata: dict):
+        profiler.dump_stats(self._path(profile_id, "prof"))
+        with open(self._path(profile_id, "json"), 'w', encoding='utf-8') as file:
+            json.dump(metadata, file)
+
+        # drop the oldest profiles beyond the limit (ids start with a timestamp)
+        profiles = sorted(glob.glob(os.path.join(self.directory, "*.prof")))
+        for path in profiles[:-self.max_files]:
+            for stale in (path, path[:-len(".prof")] + ".json"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+    def list(self) -> list:
+        """Metadata of stored profiles, newest first"""
+        profiles = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.json")), reverse=True):
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    profiles.append(json.load(file))
+            except (OSError, ValueError):
+                continue  # removed or being written concurrently
+        return profiles
+
+    def profile_path(self, profile_id: str) -> str:
+        path = self._path(profile_id, "prof")
+        if not os.path.exists(path):
+            raise FileNotFoundError(profile_id)
+        return path
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware: a header check per request, nothing else unless triggered"""
+
+    def __init__(self, app, store: ProfileStore, token: str):
+        self.app = app
+        self.store = store
+        self.token = token.encode()
+
+    def _triggered(self, scope) -> bool:
+        if scope["type"] != "http" or not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if not self._triggered(scope):
+            return await self.app(scope, receive, send)
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:60] or "root"
+        profile_id = f"{time.time_ns()}-{scope['method']}-{slug}"
+        status = {"code": None}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        profiled = _ProfiledCoroutine(self.app(scope, receive, send_with_id), profiler)
+        started = time.perf_counter()
+        try:
+            await profiled
+        finally:
+            wall = time.perf_counter() - started
+            metadata = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status["code"],
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "wall_ms": round(wall * 1000, 2),
+                "on_loop_ms": round(profiled.on_loop * 1000, 2),
+                "waiting_ms": round((wall - profiled.on_loop) * 1000, 2),
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile_id, profiler, metadata)
+                logger.info(f"Request profile saved: {metadata}")
+            except Exception as e:
+                logger.error(f"Failed to save request profile {profile_id}: {e}")
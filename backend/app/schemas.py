@@ -0,0 +1,64 @@
+"""
+Response Schemas Module
+
+Typed shapes of the read endpoints.
+
+- *View dataclasses: slotted row objects filled from column-only queries and
+  serialized directly by orjson (no dict building, no jsonable_encoder pass)
+- *Response pydantic models: the same shapes for validation and the OpenAPI docs
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+@dataclass(slots=True)
+class AnimalView:
+    id: int
+    name: str
+    species: Optional[str]
+    habitat: Optional[str]
+    diet: Optional[str]
+    description: Optional[str]
+
+
+@dataclass(slots=True)
+class AnalysisResultView:
+    id: int
+    image_url: str
+    label: Optional[str]
+    confidence: Optional[float]
+    created_at: datetime
+    matched_animal: Optional[AnimalView]
+
+
+class AnimalResponse(BaseModel):
+    id: int
+    name: str
+    species: Optional[str] = None
+    habitat: Optional[str] = None
+    diet: Optional[str] = None
+    description: Optional[str] = None
+
+
+class AnalysisResultResponse(BaseModel):
+    id: int
+    image_url: str
+    label: Optional[str] = None
+    confidence: Optional[float] = None
+    created_at: datetime
+    matched_animal: Optional[AnimalResponse] = None
+
+
+class AnimalSearchHit(AnimalResponse):
+    rank: float
+
+
+class AnimalSearchResponse(BaseModel):
+    query: str
+    match: str  # "fulltext" or "fuzzy"
+    limit: int
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page, null on the last page
+    results: List[AnimalSearchHit]
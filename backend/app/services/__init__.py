@@ -1,2 +1,2 @@
-from .s3_service import s3_service
+from .storage import get_storage
 from .rekognition_service import rekognition_service 
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Local Filesystem Storage Module
+
+Stores uploaded images on the API host, for on-prem and edge deployments.
+
+Features:
+- Hash-sharded directories (ab/cd/abcd....jpg) to keep directories small
+- Atomic writes: temp file + fsync + rename, readers never see partial files
+- Memory-mapped reads for Rekognition and for serving (/api/images/{key})
+- Partition archives in a separate, owner-only directory (LOCAL_ARCHIVE_ROOT)
+"""
+
+import asyncio
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+from .storage import StorageBackend, IMAGE_MEDIA_TYPES
+from ..logger import logger
+
+# <2 hex>/<2 hex>/<32 hex>[.ext] - anything else is rejected before touching the disk
+KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{32}(\.[A-Za-z0-9]{1,10})?$")
+# <table>/<file> for archives stored with save_archive
+ARCHIVE_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_-]+/[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+
+# Chunk size used when streaming a file to a client
+CHUNK_SIZE = 256 * 1024
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str, base_url: str, archive_root: str):
+        self.root = os.path.abspath(root)
+        self.archive_root = os.path.abspath(archive_root)
+        if os.path.commonpath([self.root, self.archive_root]) == self.root:
+            raise ValueError("LOCAL_ARCHIVE_ROOT must not be inside LOCAL_STORAGE_ROOT")
+        self.base_url = base_url.rstrip('/')
+        os.makedirs(self.root, exist_ok=True)
+        logger.info(f"Local storage initialized at {self.root}")
+
+    def _path(self, key: str) -> str:
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid storage key: {key}")
+        return os.path.join(self.root, *key.split('/'))
+
+    def _write_atomic(self, path: str, write, mode: int = 0o777):
+        """Call write(file) on a temp file next to path, then rename it into place"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=mode, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                write(file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def save(self, content: bytes, extension: str, content_type: str) -> str:
+        if extension not in IMAGE_MEDIA_TYPES:
+            raise ValueError(f"Invalid image extension: {extension}")
+        name = uuid.uuid4().hex
+        key = f"{name[:2]}/{name[2:4]}/{name}{extension}"
+
+        # file I/O and fsync are blocking, keep them off the event loop
+        await asyncio.to_thread(self._write_atomic, self._path(key), lambda file: file.write(content))
+        logger.info(f"File stored locally: {key}")
+        return key
+
+    def _copy_file(self, source: str, file):
+        with open(source, 'rb') as src:
+            shutil.copyfileobj(src, file)
+
+    async def save_archive(self, key: str, path: str, content_type: str = "application/octet-stream") -> str:
+        if not ARCHIVE_KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid archive key: {key}")
+        target = os.path.join(self.archive_root, *key.split('/'))
+        # owner-only directories; mkstemp already creates the file itself with mode 0600
+        await asyncio.to_thread(self._write_atomic, target, lambda file: self._copy_file(path, file), 0o700)
+        logger.info(f"Archive stored locally: {target}")
+        return key
+
+    def media_type(self, key: str) -> str:
+        """
+        Fixed media type a key is served with.
+
+        Raises:
+            ValueError: for keys that are not stored images (e.g. files written before uploads were typed)
+        """
+        self._path(key)  # validate
+        media_type = IMAGE_MEDIA_TYPES.get(os.path.splitext(key)[1].lower())
+        if media_type is None:
+            raise ValueError(f"Not an image key: {key}")
+        return media_type
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_from_url(self, url: str) -> str:
+        prefix = f"{self.base_url}/"
+        if not url.startswith(prefix):
+            raise ValueError(f"URL does not belong to local storage: {url}")
+        key = url[len(prefix):]
+        self._path(key)  # validate
+        return key
+
+    @contextmanager
+    def open_mmap(self, key: str) -> Iterator[mmap.mmap]:
+        """Map a stored file read-only into memory"""
+        with open(self._path(key), 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    @contextmanager
+    def rekognition_image(self, key: str) -> Iterator[dict]:
+        # the mapping spares reading the file into a bytes object first; botocore
+        # still base64-encodes it into its own request body
+        with self.open_mmap(key) as mapped:
+            yield {'Bytes': mapped}
+
+    def iter_chunks(self, key: str) -> Iterator[bytes]:
+        """Yield the file content in chunks for a streaming response"""
+        with self.open_mmap(key) as mapped:
+            for offset in range(0, len(mapped), CHUNK_SIZE):
+                yield mapped[offset:offset + CHUNK_SIZE]
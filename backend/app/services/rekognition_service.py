@@ -5,20 +5,22 @@ This module handles image analysis using AWS Rekognition service.
 It provides functionality to detect labels (objects, scenes, concepts) in images.
 
 Features:
-- Image label detection from S3 objects
+- Image label detection from S3 objects or locally stored images
 - Confidence score filtering
 - Error handling for AWS Rekognition operations
 - Support for multiple label detection
 """
 
+import asyncio
 import boto3
 from ..config import settings
 from ..logger import logger
-from urllib.parse import urlparse
+from .storage import get_storage
 
 class RekognitionService:
     def __init__(self):
         """AWS Rekognition 서비스 초기화"""
+        self.storage = get_storage()
         self.client = boto3.client(
             'rekognition',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
@@ -31,34 +33,30 @@ class RekognitionService:
         이미지에서 레이블(객체) 감지
         
         Args:
-            image_url (str): S3에 업로드된 이미지 URL
+            image_url (str): 스토리지에 업로드된 이미지 URL
             
         Returns:
             list: 감지된 레이블 목록
         """
         try:
-            # S3 URL에서 버킷과 키 추출
-            parsed_url = urlparse(image_url)
-            bucket = parsed_url.netloc.split('.')[0]
-            key = parsed_url.path.lstrip('/')
+            # URL에서 스토리지 키 추출
+            key = self.storage.key_from_url(image_url)
             
-            # Rekognition API 호출
-            response = self.client.detect_labels(
-                Image={
-                    'S3Object': {
-                        'Bucket': bucket,
-                        'Name': key
-                    }
-                },
-                MaxLabels=10,
-                MinConfidence=70
-            )
+            # Rekognition API 호출 (boto3 is blocking, so run it in a worker thread)
+            with self.storage.rekognition_image(key) as image:
+                response = await asyncio.to_thread(
+                    self.client.detect_labels,
+                    Image=image,
+                    MaxLabels=10,
+                    MinConfidence=70
+                )
             
             # 결과 처리
             labels = [
                 {
                     'name': label['Name'],
-                    'confidence': label['Confidence']
+                    'confidence': label['Confidence'],
+                    'parents': [parent['Name'] for parent in label.get('Parents', [])]
                 }
                 for label in response['Labels']
             ]
@@ -6,28 +6,34 @@ It provides functionality for file uploads and CORS configuration.
 
 Features:
 - File upload to S3 bucket and return its URL.
+- Key <-> URL resolution for the storage interface (app/services/storage.py)
 - CORS configuration for S3 bucket
 - URL generation for uploaded files
 - Error handling for S3 operations
 """
 
+import asyncio
 import boto3
 from ..config import settings
 from ..logger import logger
+from .storage import StorageBackend
+from contextlib import contextmanager
 import uuid
 import os
 import io
 
-class S3Service:
+class S3Service(StorageBackend):
     def __init__(self):
         try:
             self.s3_client = boto3.client(
                 's3',
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
+                region_name=settings.AWS_REGION,
+                endpoint_url=settings.S3_ENDPOINT_URL or None
             )
             self.bucket_name = settings.S3_BUCKET
+            self._archive_bucket_checked = False
             logger.info("S3 service initialized successfully")
             self.configure_bucket_cors()
         except Exception as e:
@@ -54,39 +60,87 @@ class S3Service:
             logger.error(f"Failed to configure CORS: {e}")
             # CORS 설정 실패는 치명적이지 않으므로 예외를 다시 발생시키지 않음
 
-    async def upload_file(self, file_content: bytes, original_filename: str) -> str:
+    async def save(self, content: bytes, extension: str, content_type: str) -> str:
         """
-        파일을 S3에 업로드하고 URL을 반환
+        파일을 S3에 업로드하고 키를 반환
+        extension / content_type은 detect_image_type으로 바이트에서 판별한 값 (클라이언트 값 사용 안 함)
         """
         try:
             # 파일 이름에 UUID 추가
-            file_extension = os.path.splitext(original_filename)[1]
-            filename = f"{uuid.uuid4()}{file_extension}"
+            filename = f"{uuid.uuid4()}{extension}"
             
-            # S3에 업로드
-            self.s3_client.upload_fileobj(
-                io.BytesIO(file_content),
+            # S3에 업로드 (boto3는 blocking이므로 event loop 밖에서 실행)
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj,
+                io.BytesIO(content),
                 self.bucket_name,
                 filename,
-                ExtraArgs={'ContentType': 'image/jpeg'}
+                ExtraArgs={'ContentType': content_type}
             )
-            
-            # S3 URL 생성
-            url = f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{filename}"
-            logger.info(f"File uploaded successfully: {url}")
-            return url
+            logger.info(f"File uploaded successfully: {filename}")
+            return filename
             
         except Exception as e:
             logger.error(f"Failed to upload file to S3: {e}")
             raise
 
-# 서비스 인스턴스 생성을 지연시킴
-_instance = None
+    def _block_public_access(self, bucket: str):
+        """archive 버킷의 public access 차단 (한 번만 실행)"""
+        if self._archive_bucket_checked:
+            return
+        try:
+            self.s3_client.put_public_access_block(
+                Bucket=bucket,
+                PublicAccessBlockConfiguration={
+                    'BlockPublicAcls': True,
+                    'IgnorePublicAcls': True,
+                    'BlockPublicPolicy': True,
+                    'RestrictPublicBuckets': True
+                }
+            )
+            logger.info(f"Blocked public access on archive bucket {bucket}")
+        except Exception as e:
+            # 권한이 없어도 새 버킷은 기본적으로 비공개이므로 업로드는 계속 진행
+            logger.error(f"Failed to block public access on archive bucket {bucket}: {e}")
+        self._archive_bucket_checked = True
 
-def get_s3_service():
-    global _instance
-    if _instance is None:
-        _instance = S3Service()
-    return _instance
+    async def save_archive(self, key: str, path: str, content_type: str = "application/octet-stream") -> str:
+        """
+        로컬 파일을 비공개 archive 버킷에 업로드 (multipart for large files)
+        이미지 버킷은 public URL로 제공되므로 archive에는 사용하지 않음
+        """
+        bucket = settings.ARCHIVE_S3_BUCKET
+        if not bucket or bucket == self.bucket_name:
+            raise ValueError("ARCHIVE_S3_BUCKET must be set to a private bucket other than S3_BUCKET")
+        await asyncio.to_thread(self._block_public_access, bucket)
+        await asyncio.to_thread(
+            self.s3_client.upload_file,
+            path,
+            bucket,
+            key,
+            ExtraArgs={'ContentType': content_type, 'ServerSideEncryption': 'AES256'}
+        )
+        logger.info(f"Archive uploaded successfully: s3://{bucket}/{key}")
+        return key
+
+    def url_for(self, key: str) -> str:
+        # S3 URL 생성 (path-style for S3-compatible endpoints)
+        if settings.S3_ENDPOINT_URL:
+            return f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{self.bucket_name}/{key}"
+        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
 
-s3_service = get_s3_service() 
\ No newline at end of file
+    def key_from_url(self, url: str) -> str:
+        prefix = self.url_for("")
+        if not url.startswith(prefix):
+            raise ValueError(f"URL does not belong to bucket {self.bucket_name}: {url}")
+        return url[len(prefix):]
+
+    @contextmanager
+    def rekognition_image(self, key: str):
+        # Rekognition reads the object from S3 itself
+        yield {
+            'S3Object': {
+                'Bucket': self.bucket_name,
+                'Name': key
+            }
+        }
@@ -0,0 +1,112 @@
+"""
+Image Storage Interface
+
+This module defines how uploaded images are stored and located.
+Every backend maps between storage keys and public URLs itself, so the rest
+of the application never parses URLs by hand.
+
+Backends:
+- "s3"    : S3Service (app/services/s3_service.py)
+- "local" : LocalStorage (app/services/local_storage.py), files on the API host
+
+Select one with the STORAGE_BACKEND setting.
+
+Uploads are typed from their bytes, never from the client's filename or
+Content-Type, so only real JPEG/PNG/GIF/WebP images are stored and served.
+"""
+
+import io
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+from PIL import Image, UnidentifiedImageError
+from ..config import settings
+
+# Pillow format -> (stored extension, media type)
+IMAGE_FORMATS = {
+    "JPEG": (".jpg", "image/jpeg"),
+    "PNG": (".png", "image/png"),
+    "GIF": (".gif", "image/gif"),
+    "WEBP": (".webp", "image/webp"),
+}
+
+# Media type served for a stored extension, other extensions are never served
+IMAGE_MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+def detect_image_type(content: bytes) -> Tuple[str, str]:
+    """
+    Identify an upload from its bytes (only the header is parsed, nothing is decoded).
+
+    Returns:
+        tuple: (extension, media type), e.g. (".png", "image/png")
+
+    Raises:
+        ValueError: if the content is not a JPEG, PNG, GIF or WebP image
+    """
+    try:
+        with Image.open(io.BytesIO(content), formats=list(IMAGE_FORMATS)) as image:
+            image_format = image.format
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise ValueError("Only JPEG, PNG, GIF and WebP images are allowed") from e
+    return IMAGE_FORMATS[image_format]
+
+
+class StorageBackend(ABC):
+    @abstractmethod
+    async def save(self, content: bytes, extension: str, content_type: str) -> str:
+        """Store the content under a new unique key ending in `extension` and return the key"""
+
+    @abstractmethod
+    async def save_archive(self, key: str, path: str, content_type: str = "application/octet-stream") -> str:
+        """
+        Store a local file under `<table>/<file>` in the private archive location
+        (never reachable through url_for) and return the key
+        """
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """Public URL of a stored key"""
+
+    @abstractmethod
+    def key_from_url(self, url: str) -> str:
+        """Inverse of url_for, raises ValueError for URLs of another backend"""
+
+    @abstractmethod
+    @contextmanager
+    def rekognition_image(self, key: str) -> Iterator[dict]:
+        """Yield the `Image` argument for Rekognition detect_labels"""
+
+    async def upload_file(self, file_content: bytes) -> str:
+        """
+        Store an uploaded image and return its public URL.
+
+        Raises:
+            ValueError: if the content is not an allowed image type
+        """
+        extension, content_type = detect_image_type(file_content)
+        key = await self.save(file_content, extension, content_type)
+        return self.url_for(key)
+
+
+_instance = None
+
+def get_storage() -> StorageBackend:
+    """Create the configured storage backend once"""
+    global _instance
+    if _instance is None:
+        if settings.STORAGE_BACKEND == "local":
+            from .local_storage import LocalStorage
+            _instance = LocalStorage(settings.LOCAL_STORAGE_ROOT, settings.LOCAL_STORAGE_URL, settings.LOCAL_ARCHIVE_ROOT)
+        elif settings.STORAGE_BACKEND == "s3":
+            from .s3_service import S3Service
+            _instance = S3Service()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+    return _instance
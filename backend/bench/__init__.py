@@ -0,0 +1,12 @@
+"""
+Benchmark suite for the Animal Lens backend.
+
+Runs against local stand-ins only (see docker-compose.bench.yml):
+- Postgres in Docker
+- local filesystem storage or MinIO instead of S3
+- a fake Rekognition client that replays recorded responses
+
+Entry points (run from the backend directory):
+    python -m bench.load   # /api/upload and /api/results/{id} across concurrency levels
+    python -m bench.micro       # label selection and database helpers
+"""
@@ -0,0 +1,178 @@
+"""
+Shared helpers for the benchmarks: environment, timing, reports and baselines.
+"""
+
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from functools import wraps
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(__file__)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines.json")
+# p95 changes smaller than this are timer noise, whatever the relative change
+DEFAULT_MIN_DELTA_MS = 0.05
+
+# app/logger.py puts the root logger at DEBUG, so libraries log every request too
+NOISY_LOGGERS = ("animal_lens", "sqlalchemy.engine", "botocore", "boto3", "s3transfer", "urllib3", "httpx", "httpcore")
+
+# Settings for the local stand-ins, overridable through the environment
+BENCH_ENV = {
+    "ENVIRONMENT": "bench",
+    "AWS_ACCESS_KEY_ID": "bench",
+    "AWS_SECRET_ACCESS_KEY": "bench",
+    "AWS_REGION": "us-east-1",
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_HOST": "localhost",
+    "DB_PORT": "55432",
+    "DB_NAME": "animallens",
+    "FRONTEND_URL": "http://localhost:3000",
+    "BACKEND_URL": "http://bench",
+    "STORAGE_BACKEND": "local",
+}
+
+
+def configure_env():
+    """Point the app at the local stand-ins. Must run before importing `app`."""
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    if os.environ["STORAGE_BACKEND"] == "local":
+        os.environ.setdefault("LOCAL_STORAGE_ROOT", tempfile.mkdtemp(prefix="animallens-bench-"))
+
+
+def quiet_logging():
+    """Silence per-request application, SQL, AWS SDK and HTTP client logging so it does not dominate timings"""
+    from app.database import engine
+    engine.echo = False
+    logging.getLogger().setLevel(logging.WARNING)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+class Recorder:
+    """Collects durations (seconds) per name"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def add(self, name: str, seconds: float):
+        self.samples[name].append(seconds)
+
+    def reset(self):
+        self.samples.clear()
+
+    def timed(self, name: str, func):
+        """Wrap an async function so each call is recorded under `name`"""
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - started)
+        return wrapper
+
+
+def allocated_bytes(func, iterations: int = 200) -> int:
+    """Average peak memory allocated by one call of func()"""
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            total += tracemalloc.get_traced_memory()[1] - before
+        return total // iterations
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(samples: List[float], elapsed: float = None) -> Dict:
+    """Latency percentiles in milliseconds, plus throughput when elapsed is given"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    summary = {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+    }
+    if elapsed:
+        summary["throughput_rps"] = round(len(ordered) / elapsed, 2)
+    return summary
+
+
+def print_report(title: str, report: Dict[str, Dict]):
+    print(f"\n=== {title} ===")
+    print(f"{'scenario':<44}{'count':>7}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'alloc B':>10}")
+    for name, row in report.items():
+        if not row.get("count"):
+            continue
+        print(
+            f"{name:<44}{row['count']:>7}{row.get('throughput_rps', ''):>10}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row.get('alloc_bytes', ''):>10}"
+        )
+
+
+def save_baseline(path: str, suite: str, report: Dict[str, Dict]):
+    """Store the report of one suite ("load" or "micro") as the new baseline"""
+    baselines = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            baselines = json.load(file)
+    baselines[suite] = report
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+    print(f"\nBaseline for '{suite}' saved to {path}")
+
+
+def check_baseline(path: str, suite: str, report: Dict[str, Dict], tolerance: float,
+                   min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> bool:
+    """
+    Compare a report with the stored baseline.
+    A scenario regresses when p95 or allocations grow, or throughput drops, by more than `tolerance`.
+    p95 growth must also exceed `min_delta_ms`, so microsecond scenarios do not fail on timer noise.
+
+    Returns:
+        bool: True if no scenario regressed
+    """
+    if not os.path.exists(path):
+        print(f"\nNo baseline file at {path}, run with --save-baseline first")
+        return False
+    with open(path, 'r', encoding='utf-8') as file:
+        baseline = json.load(file).get(suite, {})
+
+    regressions = []
+    for name, current in report.items():
+        base = baseline.get(name)
+        if not base or not base.get("count") or not current.get("count"):
+            continue
+        p95_delta = current["p95_ms"] - base["p95_ms"]
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance) and p95_delta > min_delta_ms:
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if "throughput_rps" in base and current.get("throughput_rps", 0) < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {current.get('throughput_rps')} rps")
+        if "alloc_bytes" in base and current.get("alloc_bytes", 0) > base["alloc_bytes"] * (1 + tolerance):
+            regressions.append(f"{name}: allocations {base['alloc_bytes']} -> {current['alloc_bytes']} bytes/call")
+
+    if regressions:
+        print(f"\n!!! PERFORMANCE REGRESSION (tolerance {tolerance:.0%}) !!!")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        return False
+    print(f"\nNo regressions against baseline (tolerance {tolerance:.0%})")
+    return True
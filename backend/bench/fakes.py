@@ -0,0 +1,73 @@
+"""
+Fake Rekognition client for benchmarks.
+
+Replays recorded `detect_labels` responses with a configurable latency
+distribution. It replaces `rekognition_service.client`, so the real
+RekognitionService code (storage lookup, worker thread, label parsing) still runs.
+"""
+
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+
+DEFAULT_RESPONSES = os.path.join(os.path.dirname(__file__), "fixtures", "rekognition_labels.jsonl")
+
+
+class LatencyModel:
+    """
+    Latency distribution in seconds, parsed from a spec string:
+        fixed:0.1               always 100 ms
+        uniform:0.05:0.3        between 50 and 300 ms
+        normal:0.2:0.05         mean 200 ms, stddev 50 ms (clamped at 0)
+        lognormal:0.2:0.5       median 200 ms, sigma 0.5 (long tail, closest to real AWS calls)
+    """
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 42):
+        kind, *values = spec.split(":")
+        self.kind = kind
+        self.values = [float(value) for value in values]
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(self.values) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self) -> float:
+        with self.lock:
+            if self.kind == "fixed":
+                return self.values[0]
+            if self.kind == "uniform":
+                return self.random.uniform(*self.values)
+            if self.kind == "normal":
+                return max(0.0, self.random.gauss(*self.values))
+            median, sigma = self.values
+            return self.random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+def load_responses(path: str = DEFAULT_RESPONSES) -> list:
+    """Read recorded detect_labels responses, one JSON object per line"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class FakeRekognitionClient:
+    """Drop-in for the boto3 Rekognition client, only `detect_labels` is implemented"""
+
+    def __init__(self, responses: list, latency: LatencyModel):
+        self.latency = latency
+        self.calls = 0
+        self._responses = itertools.cycle(responses)
+        self._lock = threading.Lock()
+
+    def detect_labels(self, Image, MaxLabels=10, MinConfidence=55):
+        with self._lock:
+            response = next(self._responses)
+            self.calls += 1
+        # runs in a worker thread (asyncio.to_thread), like the real blocking boto3 call
+        time.sleep(self.latency.sample())
+        labels = [label for label in response["Labels"] if label["Confidence"] >= MinConfidence]
+        return {"Labels": labels[:MaxLabels]}
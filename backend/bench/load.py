@@ -0,0 +1,160 @@
+"""
+Load Test
+
+Drives /api/upload and /api/results/{id} in-process (httpx ASGI transport)
+against local Postgres, local storage or MinIO, and the fake Rekognition client.
+Reports throughput and p50/p95/p99 per endpoint and per pipeline stage
+for every concurrency level.
+
+Usage (from the backend directory, after `docker compose -f docker-compose.bench.yml up -d`):
+    python -m bench.load --concurrency 1,8,32 --requests 200 --rekognition-latency lognormal:0.2:0.5
+    python -m bench.load --save-baseline
+    python -m bench.load --check-baseline --tolerance 0.2   # exit code 1 on regression
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import time
+from .common import (
+    DEFAULT_BASELINE, DEFAULT_MIN_DELTA_MS, Recorder, check_baseline, configure_env, print_report,
+    quiet_logging, save_baseline, summarize
+)
+from .fakes import DEFAULT_RESPONSES, FakeRekognitionClient, LatencyModel, load_responses
+
+configure_env()
+
+import httpx  # noqa: E402
+from PIL import Image  # noqa: E402
+from app import main  # noqa: E402
+
+def make_image_payload() -> bytes:
+    """A real JPEG (uploads are typed from their bytes), noisy so it does not compress to nothing"""
+    buffer = io.BytesIO()
+    Image.effect_noise((320, 240), 64).convert("RGB").save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+IMAGE_PAYLOAD = make_image_payload()
+
+
+def instrument(recorder: Recorder):
+    """Wrap the pipeline stages of /api/upload so each one is timed"""
+    main.storage.save = recorder.timed("stage.storage_save", main.storage.save)
+    main.rekognition_service.detect_labels = recorder.timed(
+        "stage.rekognition", main.rekognition_service.detect_labels
+    )
+    main.database.is_animal = recorder.timed("stage.db_is_animal", main.database.is_animal)
+    main.database.save_analysis_result = recorder.timed(
+        "stage.db_save_analysis", main.database.save_analysis_result
+    )
+    main.database.save_unidentified_animal = recorder.timed(
+        "stage.db_save_unidentified", main.database.save_unidentified_animal
+    )
+    main.process_analysis_results = recorder.timed("stage.process_results", main.process_analysis_results)
+
+
+async def run_requests(total: int, concurrency: int, send):
+    """Call `send(i)` for i in range(total) with `concurrency` workers, return per-call durations"""
+    durations = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            ok = await send(i)
+            durations.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return durations, errors, time.perf_counter() - started
+
+
+async def run_level(client: httpx.AsyncClient, recorder: Recorder, concurrency: int, total: int) -> dict:
+    report = {}
+    analysis_ids = []
+    recorder.reset()
+
+    async def upload(i):
+        response = await client.post(
+            "/api/upload",
+            files={"file": (f"bench-{i}.jpg", IMAGE_PAYLOAD, "image/jpeg")}
+        )
+        if response.status_code != 200:
+            return False
+        analysis_ids.append(response.json()["analysis_id"])
+        return True
+
+    durations, errors, elapsed = await run_requests(total, concurrency, upload)
+    report[f"upload@c{concurrency}"] = {**summarize(durations, elapsed), "errors": errors}
+    for stage, samples in sorted(recorder.samples.items()):
+        report[f"{stage}@c{concurrency}"] = summarize(samples)
+
+    if analysis_ids:
+        async def get_result(i):
+            response = await client.get(f"/api/results/{analysis_ids[i % len(analysis_ids)]}")
+            return response.status_code == 200
+
+        durations, errors, elapsed = await run_requests(total, concurrency, get_result)
+        report[f"results@c{concurrency}"] = {**summarize(durations, elapsed), "errors": errors}
+
+    return report
+
+
+async def run(args) -> dict:
+    quiet_logging()
+    fake_client = FakeRekognitionClient(
+        load_responses(args.responses),
+        LatencyModel(args.rekognition_latency, seed=args.seed)
+    )
+    main.rekognition_service.client = fake_client
+    recorder = Recorder()
+    instrument(recorder)
+
+    report = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # warm up connection pool and catalog cache
+        await run_level(client, recorder, concurrency=1, total=min(5, args.requests))
+        for concurrency in args.concurrency:
+            report.update(await run_level(client, recorder, concurrency, args.requests))
+    return report
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Animal Lens load test")
+    parser.add_argument("--concurrency", type=lambda value: [int(v) for v in value.split(",")], default=[1, 8, 32],
+                        help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and level")
+    parser.add_argument("--rekognition-latency", default="lognormal:0.2:0.5", help="see bench.fakes.LatencyModel")
+    parser.add_argument("--responses", default=DEFAULT_RESPONSES, help="recorded detect_labels responses (JSONL)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="ignore p95 regressions smaller than this (timer noise)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report("Load test", report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    if args.save_baseline:
+        save_baseline(args.baseline, "load", report)
+    if args.check_baseline and not check_baseline(args.baseline, "load", report, args.tolerance, args.min_delta_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,180 @@
+"""
+Micro-benchmarks
+
+Times single operations in a loop:
+- label selection (app/labels.py), no I/O
+- /api/results/{id} serialization: ORM-style dict + jsonable_encoder (old path)
+  vs slotted view + orjson (current path), with allocated bytes per call
+- process_analysis_results end to end against the local database
+- Database helpers: catalog lookups, saves, search, reads
+
+Usage (from the backend directory):
+    python -m bench.micro --iterations 500
+    python -m bench.micro --pure-only                 # no database needed
+    python -m bench.micro --check-baseline --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from .common import (
+    DEFAULT_BASELINE, DEFAULT_MIN_DELTA_MS, allocated_bytes, check_baseline, configure_env, print_report,
+    quiet_logging, save_baseline, summarize
+)
+from .fakes import load_responses
+
+configure_env()
+
+from app.labels import select_label, compact_labels  # noqa: E402
+from app.schemas import AnalysisResultView, AnimalView  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import ORJSONResponse  # noqa: E402
+
+
+def parsed_label_sets() -> list:
+    """Recorded responses in the format returned by RekognitionService.detect_labels"""
+    return [
+        [
+            {
+                "name": label["Name"],
+                "confidence": label["Confidence"],
+                "parents": [parent["Name"] for parent in label.get("Parents", [])],
+            }
+            for label in response["Labels"]
+        ]
+        for response in load_responses()
+    ]
+
+
+def time_sync(func, iterations: int) -> list:
+    durations = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        func(i)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+async def time_async(func, iterations: int) -> list:
+    durations = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await func(i)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def serialize_dict_path(view: AnalysisResultView) -> bytes:
+    """Former get_analysis_result: hand-built dicts, jsonable_encoder, JSONResponse json.dumps"""
+    animal = view.matched_animal
+    content = {
+        "id": view.id,
+        "image_url": view.image_url,
+        "label": view.label,
+        "confidence": view.confidence,
+        "created_at": view.created_at,
+        "matched_animal": {
+            "id": animal.id,
+            "name": animal.name,
+            "species": animal.species,
+            "habitat": animal.habitat,
+            "diet": animal.diet,
+            "description": animal.description
+        }
+    }
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def serialize_orjson_path(view: AnalysisResultView) -> bytes:
+    return ORJSONResponse(view).body
+
+
+def run_pure(iterations: int) -> dict:
+    label_sets = parsed_label_sets()
+    view = AnalysisResultView(
+        1, "http://bench/api/images/00/00/00000000000000000000000000000000.jpg", "Dog", 98.7,
+        datetime(2025, 1, 1, 12, 0, 0, 123456),
+        AnimalView(6, "Dog", "Canis lupus familiaris", "Domestic environments", "Omnivore", "Loyal companion animal...")
+    )
+    return {
+        "select_label": summarize(time_sync(lambda i: select_label(label_sets[i % len(label_sets)]), iterations)),
+        "compact_labels": summarize(time_sync(lambda i: compact_labels(label_sets[i % len(label_sets)]), iterations)),
+        "results.serialize.jsonable_encoder": {
+            **summarize(time_sync(lambda i: serialize_dict_path(view), iterations)),
+            "alloc_bytes": allocated_bytes(lambda: serialize_dict_path(view)),
+        },
+        "results.serialize.orjson": {
+            **summarize(time_sync(lambda i: serialize_orjson_path(view), iterations)),
+            "alloc_bytes": allocated_bytes(lambda: serialize_orjson_path(view)),
+        },
+    }
+
+
+async def run_db(iterations: int) -> dict:
+    from app import main
+    from app.database import database
+    quiet_logging()
+
+    label_sets = parsed_label_sets()
+    image_url = main.storage.url_for("00/00/00000000000000000000000000000000.jpg")
+    saved = await database.save_unidentified_animal(image_url, "Otter", 93.4, labels=compact_labels(label_sets[3]))
+    await database.catalog.reload()
+
+    async def search_uncached(i):
+        database.catalog.search_cache.clear()
+        await database.search_animals("bamboo forest")
+
+    return {
+        "process_analysis_results": summarize(await time_async(
+            lambda i: main.process_analysis_results(image_url, label_sets[i % len(label_sets)]), iterations
+        )),
+        "db.is_animal": summarize(await time_async(lambda i: database.is_animal("Dog"), iterations)),
+        "db.find_animal_id": summarize(await time_async(lambda i: database.find_animal_id("Panda"), iterations)),
+        "db.catalog_reload": summarize(await time_async(lambda i: database.catalog.reload(), iterations)),
+        "db.save_analysis_result": summarize(await time_async(
+            lambda i: database.save_analysis_result(image_url, "Dog", 98.7, labels=compact_labels(label_sets[0])),
+            iterations
+        )),
+        "db.get_analysis_result": summarize(await time_async(
+            lambda i: database.get_analysis_result(saved["analysis_id"]), iterations
+        )),
+        "db.get_unidentified_animal": summarize(await time_async(
+            lambda i: database.get_unidentified_animal(str(saved["unidentified_id"])), iterations
+        )),
+        "db.search_animals.cached": summarize(await time_async(
+            lambda i: database.search_animals("bamboo forest"), iterations
+        )),
+        "db.search_animals.uncached": summarize(await time_async(search_uncached, iterations)),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Animal Lens micro-benchmarks")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--pure-only", action="store_true", help="skip benchmarks that need the database")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="ignore p95 regressions smaller than this (timer noise)")
+    args = parser.parse_args()
+
+    report = run_pure(args.iterations * 20)
+    if not args.pure_only:
+        report.update(asyncio.run(run_db(args.iterations)))
+    print_report("Micro-benchmarks", report)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, "micro", report)
+    if args.check_baseline and not check_baseline(args.baseline, "micro", report, args.tolerance, args.min_delta_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
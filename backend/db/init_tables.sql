@@ -13,31 +13,112 @@ DROP TABLE IF EXISTS animals CASCADE;
 -- create tables
 CREATE TABLE animals (
     id SERIAL PRIMARY KEY,
-    name VARCHAR(100) NOT NULL,
+    name VARCHAR(100) NOT NULL UNIQUE,  -- upsert key for catalog imports
     species VARCHAR(100),
     habitat TEXT,
     diet TEXT,
-    description TEXT
+    description TEXT,
+    -- full-text search document (see db/migrations/003_animals_search.sql)
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(species, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(habitat, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
 );
 
+-- search indexes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX animals_search_vector_idx ON animals USING GIN (search_vector);
+CREATE INDEX animals_name_trgm_gist_idx ON animals USING GIST (name gist_trgm_ops);
+CREATE INDEX animals_species_trgm_gist_idx ON animals USING GIST (species gist_trgm_ops);
+
+-- monthly partitions <table>_pYYYYMM (same function as db/migrations/004_partition_by_month.sql)
+CREATE OR REPLACE FUNCTION create_monthly_partitions(parent TEXT, months_ahead INTEGER DEFAULT 3, months_back INTEGER DEFAULT 0)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE;
+    month_end DATE;
+    partition_name TEXT;
+    default_name TEXT := parent || '_default';
+    has_default BOOLEAN;
+    stranded BOOLEAN;
+    created INTEGER := 0;
+BEGIN
+    has_default := to_regclass(default_name) IS NOT NULL;
+    FOR i IN -months_back..months_ahead LOOP
+        month_start := (date_trunc('month', now()) + make_interval(months => i))::date;
+        month_end := (month_start + interval '1 month')::date;
+        partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYYMM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            stranded := false;
+            IF has_default THEN
+                EXECUTE format(
+                    'SELECT EXISTS (SELECT 1 FROM %I WHERE created_at >= %L AND created_at < %L)',
+                    default_name, month_start, month_end
+                ) INTO stranded;
+            END IF;
+
+            IF stranded THEN
+                -- rows of this month already landed in the default partition, which would
+                -- violate the new partition's range: move them while the default is detached
+                -- (ACCESS EXCLUSIVE on the parent, rare: only when ensure did not run in time)
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, default_name);
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, parent, month_start, month_end
+                );
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    default_name, month_start, month_end, partition_name
+                );
+                EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', parent, default_name);
+            ELSE
+                -- standalone table + ATTACH only takes SHARE UPDATE EXCLUSIVE on the parent,
+                -- so reads and inserts keep running (CREATE ... PARTITION OF would block them)
+                EXECUTE format('CREATE TABLE %I (LIKE %I)', partition_name, parent);
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    parent, partition_name, month_start, month_end
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END
+$$;
+
+-- partitioned by month on created_at, so the primary key includes created_at
 CREATE TABLE analysis_results (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     image_url TEXT NOT NULL,
     label VARCHAR(100),
     confidence DECIMAL(5, 2),
     matched_animal_id INTEGER REFERENCES animals(id),
-    created_at TIMESTAMP DEFAULT NOW()
-);
+    labels JSONB,  -- full Rekognition label set, used for re-ranking
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+CREATE INDEX analysis_results_image_url_idx ON analysis_results (image_url);
+CREATE TABLE analysis_results_default PARTITION OF analysis_results DEFAULT;
+SELECT create_monthly_partitions('analysis_results', 3);
 
 -- table to save unidentified animals
 CREATE TABLE unidentified_animals (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     label VARCHAR(100) NOT NULL,
     confidence DECIMAL(5, 2),
     image_url TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT NOW(),
-    status VARCHAR(50) DEFAULT 'pending'  -- pending, approved, rejected
-);
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    status VARCHAR(50) DEFAULT 'pending',  -- pending, approved, rejected, resolved (matched after reprocessing)
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+CREATE TABLE unidentified_animals_default PARTITION OF unidentified_animals DEFAULT;
+SELECT create_monthly_partitions('unidentified_animals', 3);
 
 -- insert initial animal data
 INSERT INTO animals (name, species, habitat, diet, description) VALUES
@@ -1,23 +1,33 @@
 import psycopg2
 import os
+import sys
+import glob
 from dotenv import load_dotenv
 # purpose
 # change table schema
 # change table relationships
+#
+# usage
+# python db/migrate.py          -> recreate all tables from init_tables.sql (drops data)
+# python db/migrate.py upgrade  -> apply db/migrations/*.sql in order (keeps data)
 
 # load .env.development file
 load_dotenv('.env.development')
 
 
-def run_migration():
+def get_conn_params():
     # RDS connection information (default DB)
-    conn_params = {
+    return {
         'dbname': os.getenv('DB_NAME', 'animallens'),
         'user': os.getenv('DB_USER'),
         'password': os.getenv('DB_PASSWORD'),
         'host': os.getenv('DB_HOST'),
         'port': os.getenv('DB_PORT', '5432')
     }
+
+
+def run_migration():
+    conn_params = get_conn_params()
     
     try:
         # connect to PostgreSQL server
@@ -41,5 +51,34 @@ def run_migration():
         if 'conn' in locals():
             conn.close()
 
+def run_upgrade():
+    # apply incremental migrations without dropping data.
+    # every file in db/migrations must be idempotent (IF NOT EXISTS, ...)
+    conn_params = get_conn_params()
+    
+    try:
+        conn = psycopg2.connect(**conn_params)
+        conn.autocommit = True
+        cur = conn.cursor()
+        
+        for path in sorted(glob.glob('db/migrations/*.sql')):
+            with open(path, 'r', encoding='utf-8') as file:
+                cur.execute(file.read())
+            print(f"Applied {os.path.basename(path)}")
+        
+        print("Migrations applied successfully!")
+        
+    except Exception as e:
+        print(f"Error during upgrade: {e}")
+        
+    finally:
+        if 'cur' in locals():
+            cur.close()
+        if 'conn' in locals():
+            conn.close()
+
 if __name__ == "__main__":
-    run_migration() 
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "upgrade":
+        run_upgrade()
+    else:
+        run_migration() 
\ No newline at end of file
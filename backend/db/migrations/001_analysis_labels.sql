@@ -0,0 +1,6 @@
+-- purpose
+-- store the full Rekognition label set for every analysis
+-- so results can be re-ranked without calling Rekognition again
+-- (see app/jobs/rerank.py)
+
+ALTER TABLE analysis_results ADD COLUMN IF NOT EXISTS labels JSONB;
@@ -0,0 +1,6 @@
+-- purpose
+-- make animals.name the upsert key for bulk catalog imports
+-- (see Database.import_animals)
+-- fails if the catalog already contains duplicate names; remove them first
+
+CREATE UNIQUE INDEX IF NOT EXISTS animals_name_key ON animals (name);
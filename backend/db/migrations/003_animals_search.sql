@@ -0,0 +1,22 @@
+-- purpose
+-- full-text search over the animal catalog (GET /api/animals/search)
+-- search_vector: weighted tsvector, kept up to date by Postgres
+-- trigram indexes: typo-tolerant fallback on name and species
+--   GiST, so they also serve nearest-first ordering (name <-> :q) besides name % :q
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE animals ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(species, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(habitat, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS animals_search_vector_idx ON animals USING GIN (search_vector);
+-- replaces the earlier GIN trigram indexes
+DROP INDEX IF EXISTS animals_name_trgm_idx;
+DROP INDEX IF EXISTS animals_species_trgm_idx;
+CREATE INDEX IF NOT EXISTS animals_name_trgm_gist_idx ON animals USING GIST (name gist_trgm_ops);
+CREATE INDEX IF NOT EXISTS animals_species_trgm_gist_idx ON animals USING GIST (species gist_trgm_ops);
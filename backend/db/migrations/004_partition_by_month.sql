@@ -0,0 +1,153 @@
+-- purpose
+-- monthly range partitioning on created_at for analysis_results and unidentified_animals
+-- partitions are named <table>_pYYYYMM; rows outside them go to <table>_default
+-- new partitions: created by the API on startup and every PARTITION_ENSURE_INTERVAL seconds,
+--                 or by hand with python -m app.jobs.partitions ensure
+-- create_monthly_partitions moves rows that landed in <table>_default into the new partition
+-- retention: python -m app.jobs.partitions retain (detach, export to storage, drop)
+--
+-- warning: converting existing tables copies every row, run it in a maintenance window.
+-- the primary key becomes (id, created_at) because it must include the partition key.
+
+-- create the partitions of <parent> from <months_back> months ago to <months_ahead> months ahead
+CREATE OR REPLACE FUNCTION create_monthly_partitions(parent TEXT, months_ahead INTEGER DEFAULT 3, months_back INTEGER DEFAULT 0)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE;
+    month_end DATE;
+    partition_name TEXT;
+    default_name TEXT := parent || '_default';
+    has_default BOOLEAN;
+    stranded BOOLEAN;
+    created INTEGER := 0;
+BEGIN
+    has_default := to_regclass(default_name) IS NOT NULL;
+    FOR i IN -months_back..months_ahead LOOP
+        month_start := (date_trunc('month', now()) + make_interval(months => i))::date;
+        month_end := (month_start + interval '1 month')::date;
+        partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYYMM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            stranded := false;
+            IF has_default THEN
+                EXECUTE format(
+                    'SELECT EXISTS (SELECT 1 FROM %I WHERE created_at >= %L AND created_at < %L)',
+                    default_name, month_start, month_end
+                ) INTO stranded;
+            END IF;
+
+            IF stranded THEN
+                -- rows of this month already landed in the default partition, which would
+                -- violate the new partition's range: move them while the default is detached
+                -- (ACCESS EXCLUSIVE on the parent, rare: only when ensure did not run in time)
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, default_name);
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, parent, month_start, month_end
+                );
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    default_name, month_start, month_end, partition_name
+                );
+                EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', parent, default_name);
+            ELSE
+                -- standalone table + ATTACH only takes SHARE UPDATE EXCLUSIVE on the parent,
+                -- so reads and inserts keep running (CREATE ... PARTITION OF would block them)
+                EXECUTE format('CREATE TABLE %I (LIKE %I)', partition_name, parent);
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    parent, partition_name, month_start, month_end
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END
+$$;
+
+-- number of whole months between the oldest row of a table and now
+CREATE OR REPLACE FUNCTION months_since(oldest TIMESTAMP)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    SELECT COALESCE(
+        (EXTRACT(YEAR FROM age(date_trunc('month', now()), date_trunc('month', oldest))) * 12
+         + EXTRACT(MONTH FROM age(date_trunc('month', now()), date_trunc('month', oldest))))::INTEGER,
+        0
+    )
+$$;
+
+-- analysis_results
+DO $$
+DECLARE
+    months INTEGER;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'analysis_results'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE analysis_results RENAME TO analysis_results_unpartitioned;
+    ALTER TABLE analysis_results_unpartitioned RENAME CONSTRAINT analysis_results_pkey TO analysis_results_unpartitioned_pkey;
+    ALTER SEQUENCE analysis_results_id_seq OWNED BY NONE;
+
+    CREATE TABLE analysis_results (
+        id INTEGER NOT NULL DEFAULT nextval('analysis_results_id_seq'),
+        image_url TEXT NOT NULL,
+        label VARCHAR(100),
+        confidence DECIMAL(5, 2),
+        matched_animal_id INTEGER REFERENCES animals(id),
+        labels JSONB,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+    ALTER SEQUENCE analysis_results_id_seq OWNED BY analysis_results.id;
+    CREATE INDEX analysis_results_image_url_idx ON analysis_results (image_url);
+    CREATE TABLE analysis_results_default PARTITION OF analysis_results DEFAULT;
+
+    SELECT months_since(min(created_at)) INTO months FROM analysis_results_unpartitioned;
+    PERFORM create_monthly_partitions('analysis_results', 3, months);
+
+    INSERT INTO analysis_results (id, image_url, label, confidence, matched_animal_id, labels, created_at)
+    SELECT id, image_url, label, confidence, matched_animal_id, labels, COALESCE(created_at, NOW())
+    FROM analysis_results_unpartitioned;
+    DROP TABLE analysis_results_unpartitioned;
+END
+$$;
+
+-- unidentified_animals
+DO $$
+DECLARE
+    months INTEGER;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'unidentified_animals'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE unidentified_animals RENAME TO unidentified_animals_unpartitioned;
+    ALTER TABLE unidentified_animals_unpartitioned RENAME CONSTRAINT unidentified_animals_pkey TO unidentified_animals_unpartitioned_pkey;
+    ALTER SEQUENCE unidentified_animals_id_seq OWNED BY NONE;
+
+    CREATE TABLE unidentified_animals (
+        id INTEGER NOT NULL DEFAULT nextval('unidentified_animals_id_seq'),
+        label VARCHAR(100) NOT NULL,
+        confidence DECIMAL(5, 2),
+        image_url TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        status VARCHAR(50) DEFAULT 'pending',
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+    ALTER SEQUENCE unidentified_animals_id_seq OWNED BY unidentified_animals.id;
+    CREATE TABLE unidentified_animals_default PARTITION OF unidentified_animals DEFAULT;
+
+    SELECT months_since(min(created_at)) INTO months FROM unidentified_animals_unpartitioned;
+    PERFORM create_monthly_partitions('unidentified_animals', 3, months);
+
+    INSERT INTO unidentified_animals (id, label, confidence, image_url, created_at, status)
+    SELECT id, label, confidence, image_url, COALESCE(created_at, NOW()), status
+    FROM unidentified_animals_unpartitioned;
+    DROP TABLE unidentified_animals_unpartitioned;
+END
+$$;
@@ -0,0 +1,67 @@
+import json
+from app.jobs.checkpoint import Checkpoint
+
+
+def test_watermark_waits_for_earlier_rows(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), "analysis_results")
+    for row_id in (1, 2, 3):
+        checkpoint.start(row_id)
+
+    checkpoint.finish(2)
+    checkpoint.finish(3)
+    assert checkpoint.last_id == 0
+
+    checkpoint.finish(1)
+    assert checkpoint.last_id == 3
+
+
+def test_failed_rows_are_kept_and_retried(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path, "analysis_results")
+    for row_id in (1, 2, 3):
+        checkpoint.start(row_id)
+    checkpoint.finish(1)
+    checkpoint.finish(2, ok=False)
+    checkpoint.finish(3)
+    checkpoint.save()
+
+    resumed = Checkpoint(path, "analysis_results")
+    assert resumed.last_id == 3
+    assert resumed.failed == {2}
+
+    # a successful retry (below the watermark) clears the id without moving the watermark
+    resumed.start(4)
+    resumed.finish(2)
+    assert resumed.failed == set()
+    assert resumed.last_id == 3
+    resumed.finish(4)
+    assert resumed.last_id == 4
+
+
+def test_reset_only_clears_its_table(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    other = Checkpoint(path, "unidentified_animals")
+    other.start(7)
+    other.finish(7, ok=False)
+    other.save()
+    checkpoint = Checkpoint(path, "analysis_results")
+    checkpoint.start(5)
+    checkpoint.finish(5)
+    checkpoint.save()
+
+    reset = Checkpoint(path, "analysis_results", reset=True)
+    assert reset.last_id == 0
+    reset.save()
+
+    with open(path, 'r', encoding='utf-8') as file:
+        state = json.load(file)
+    assert state["analysis_results"] == {"last_id": 0, "failed": []}
+    assert state["unidentified_animals"] == {"last_id": 7, "failed": [7]}
+
+
+def test_reads_plain_watermark_files(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(json.dumps({"unidentified_animals": 42}), encoding='utf-8')
+    checkpoint = Checkpoint(str(path), "unidentified_animals")
+    assert checkpoint.last_id == 42
+    assert checkpoint.failed == set()